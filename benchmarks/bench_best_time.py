@@ -0,0 +1,73 @@
+# ==============================================================================
+# bench_best_time.py - Best-time search vs clicking through every hour
+# ==============================================================================
+# Run from the project root (needs the three .joblib artifacts):
+#     python benchmarks/bench_best_time.py
+import os
+import sys
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+from melakago.predict import Predictor
+from melakago.search import best_windows, score_hours
+from melakago.weather import FORECAST_HORIZON_DAYS
+
+REPEATS = 20
+
+
+def horizon_from_history(predictor, start_date, days):
+    """A stand-in forecast: the recorded weather of ``days`` consecutive historical days."""
+    frames = []
+    for offset in range(days):
+        day = start_date + timedelta(days=offset)
+        weather = predictor.history.day_weather(day)
+        frames.append(weather.assign(datetime=pd.Timestamp(day) + pd.to_timedelta(weather.index, unit='h')))
+    return pd.concat(frames, ignore_index=True)
+
+
+def hour_by_hour(predictor, weather):
+    """What the sidebar offers today: one single-row prediction per (date, hour)."""
+    rows = []
+    for _, row in weather.iterrows():
+        day = row['datetime'].date()
+        one = pd.DataFrame([row]).set_index(pd.Index([row['datetime'].hour]))
+        grid = predictor.predict_day_grid(one, day, predictor.history.is_holiday(day))
+        rows.append(grid.iloc[0])
+    return pd.DataFrame(rows)
+
+
+def best_of(fn, repeats=REPEATS):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def main():
+    predictor = Predictor.load()
+    weather = horizon_from_history(predictor, date(2024, 3, 1), FORECAST_HORIZON_DAYS)
+
+    scored = score_hours(predictor, weather)
+    reference = hour_by_hour(predictor, weather)
+    assert (scored['is_jam'].to_numpy() == reference['is_jam'].to_numpy()).all()
+    assert (scored['peak_category'].to_numpy() == reference['peak_category'].to_numpy()).all()
+    print(f"parity: {len(scored)} batched hours match single-hour predictions")
+
+    single, _ = best_of(lambda: hour_by_hour(predictor, weather), repeats=1)
+    print(f"{len(weather)} single-hour predictions : {single * 1000:8.1f} ms")
+    for window_hours, hour_range in [(1, None), (2, (6, 10)), (3, None)]:
+        search, windows = best_of(lambda: best_windows(score_hours(predictor, weather), 5,
+                                                       window_hours, hour_range))
+        print(f"search {FORECAST_HORIZON_DAYS} days, {window_hours}h windows, hours {hour_range}: "
+              f"{search * 1000:6.1f} ms, {len(windows)} windows found")
+    print(windows.to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
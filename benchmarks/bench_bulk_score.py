@@ -0,0 +1,124 @@
+# ==============================================================================
+# bench_bulk_score.py - Bulk scorer parity and rows/s by worker count
+# ==============================================================================
+# Run from the project root (needs the three .joblib artifacts):
+#     python benchmarks/bench_bulk_score.py [--rows 200000] [--workers 0 1 2 4]
+import argparse
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from melakago.features import MONTH_MAP
+from melakago.predict import models_hash
+from melakago.score import score_file
+
+SOURCE_CSV = os.path.join(ROOT, 'traffic_with_weather_modified.csv')
+
+
+def notebook_predictions(df):
+    """Section 7 of 03_FinalModellingPhase.ipynb: pandas features + preprocessor + sklearn predict.
+
+    Returns the labels and each forest's predict_proba, by target.
+    """
+    preprocessor = joblib.load(os.path.join(ROOT, 'preprocessor.joblib'))
+    X = df[['temperature_2m', 'relative_humidity_2m', 'weathercode', 'windspeed_10m',
+            'is_weekend', 'hour', 'is_holiday_mlk', 'day_of_week', 'month']].copy()
+    X['hour_sin'] = np.sin(2 * np.pi * X['hour'] / 24)
+    X['hour_cos'] = np.cos(2 * np.pi * X['hour'] / 24)
+    X['month_num'] = X['month'].map(MONTH_MAP)
+    X['month_sin'] = np.sin(2 * np.pi * X['month_num'] / 12)
+    X['month_cos'] = np.cos(2 * np.pi * X['month_num'] / 12)
+    X_processed = preprocessor.transform(X.drop(['hour', 'month', 'month_num'], axis=1))
+    rf_jam = joblib.load(os.path.join(ROOT, 'model_jam_classifier.joblib'))
+    rf_peak = joblib.load(os.path.join(ROOT, 'model_peak_classifier.joblib'))
+    return {target: (model.predict(X_processed), model.predict_proba(X_processed), model.classes_)
+            for target, model in (('jam', rf_jam), ('peak', rf_peak))}
+
+
+def check_parity(tmp):
+    output = os.path.join(tmp, 'parity.csv')
+    score_file(SOURCE_CSV, output, workers=0, chunksize=1000, model_dir=ROOT)
+    scored = pd.read_csv(output)
+    notebook = notebook_predictions(pd.read_csv(SOURCE_CSV))
+    assert (scored['predicted_jam'].to_numpy() == notebook['jam'][0]).all(), \
+        "jam predictions differ from the notebook"
+    assert (scored['predicted_peak_category'].to_numpy() == notebook['peak'][0]).all(), \
+        "peak predictions differ from the notebook"
+    print(f"parity: {len(scored)} rows identical to the notebook pipeline")
+    check_confidence(scored, notebook)
+
+
+def check_confidence(scored, notebook):
+    """The confidence columns are calibration.joblib applied to the notebook's probabilities, at its labels."""
+    calibration_path = os.path.join(ROOT, 'calibration.joblib')
+    calibration = joblib.load(calibration_path) if os.path.exists(calibration_path) else None
+    if calibration is None or calibration.get('models_hash') != models_hash(ROOT):
+        print("confidence: no calibration.joblib for these models; scorer output is uncalibrated")
+        calibration = None
+    for target in ('jam', 'peak'):
+        labels, proba, classes = notebook[target]
+        if calibration is not None:
+            proba = calibration[target].transform(proba)
+        expected = proba[np.arange(len(labels)), np.searchsorted(classes, labels)]
+        assert np.allclose(scored[f'{target}_confidence'].to_numpy(), expected, rtol=0, atol=1e-12), \
+            f"{target} confidence differs from the calibrated notebook probabilities"
+    print(f"confidence: {len(scored)} rows match the {'calibrated' if calibration else 'raw'} notebook probabilities")
+
+
+def make_input(tmp, n_rows, fmt):
+    source = pd.read_csv(SOURCE_CSV)
+    df = pd.concat([source] * -(-n_rows // len(source)), ignore_index=True).iloc[:n_rows]
+    path = os.path.join(tmp, f'input_{n_rows}.{fmt}')
+    if fmt == 'csv':
+        df.to_csv(path, index=False)
+    else:
+        df.to_parquet(path, index=False)
+    return path
+
+
+def run_cli(input_path, output_path, workers):
+    """Wall time and peak RSS (MB, largest single process) of one CLI run."""
+    code = (
+        "import resource, sys; from melakago.score import score_file; "
+        f"score_file({input_path!r}, {output_path!r}, workers={workers}); "
+        "own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss; "
+        "kids = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss; "
+        "print(max(own, kids))"
+    )
+    start = time.perf_counter()
+    output = subprocess.run([sys.executable, '-c', code], cwd=ROOT, capture_output=True, text=True, check=True)
+    elapsed = time.perf_counter() - start
+    return elapsed, int(output.stdout.split()[-1]) / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, nargs='+', default=[100_000, 400_000])
+    parser.add_argument('--workers', type=int, nargs='+', default=[0, 1, 2, 4])
+    parser.add_argument('--format', choices=['csv', 'parquet'], default='csv')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        check_parity(tmp)
+        print(f"cpu count: {os.cpu_count()}")
+        print(f"{'rows':>8} {'workers':>7} {'seconds':>8} {'rows/s':>8} {'peak RSS MB':>12}")
+        for n_rows in args.rows:
+            input_path = make_input(tmp, n_rows, args.format)
+            for workers in args.workers:
+                output_path = os.path.join(tmp, f'output.{args.format}')
+                elapsed, rss = run_cli(input_path, output_path, workers)
+                print(f"{n_rows:>8} {workers:>7} {elapsed:>8.1f} {n_rows / elapsed:>8.0f} {rss:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+# ==============================================================================
+# bench_calibration.py - Calibration quality and the latency it adds to predict
+# ==============================================================================
+# Run from the project root (needs the .joblib artifacts and calibration.joblib):
+#     python benchmarks/bench_calibration.py
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import joblib
+import numpy as np
+
+from melakago.calibration import fit_calibration
+from melakago.predict import Predictor
+from melakago.train import load_or_prepare
+
+BATCH_SIZES = [1, 24, 1000]
+REPEATS = 500
+
+
+def main():
+    os.chdir(ROOT)
+    raw = Predictor.load(history_csv=None, calibrated=False)
+    calibrated = Predictor.load(history_csv=None)
+    assert calibrated.calibration, "calibration.joblib not found; run python -m melakago.calibration"
+
+    prepared = joblib.load(load_or_prepare()[0])
+    _, report = fit_calibration({'jam': joblib.load('model_jam_classifier.joblib'),
+                                 'peak': joblib.load('model_peak_classifier.joblib')}, prepared)
+    for target, metrics in report.items():
+        print(f"{target}: Brier {metrics['brier']['raw']:.4f} -> {metrics['brier']['calibrated']:.4f}, "
+              f"ECE {metrics['ece']['raw']:.4f} -> {metrics['ece']['calibrated']:.4f} "
+              f"on {metrics['rows']['eval']} held-out rows")
+
+    X = np.asarray(prepared['X_processed'], dtype=np.float32)
+    a, b = raw.predict(X), calibrated.predict(X)
+    assert np.array_equal(a['is_jam'], b['is_jam']) and np.array_equal(a['peak_category'], b['peak_category'])
+    print(f"labels identical with and without calibration on {len(X)} rows")
+
+    rng = np.random.default_rng(42)
+    for size in BATCH_SIZES:
+        X_batch = X[rng.integers(0, len(X), size)]
+        repeats = REPEATS if size < 1000 else 20
+        timings = {'raw': [], 'calibrated': []}
+        for _ in range(repeats):  # interleaved, so drift hits both equally
+            for name, predictor in (('raw', raw), ('calibrated', calibrated)):
+                start = time.perf_counter()
+                predictor.predict(X_batch)
+                timings[name].append(time.perf_counter() - start)
+        raw_ms, cal_ms = (sorted(t)[len(t) // 2] * 1000 for t in timings.values())
+        print(f"{size:>6} rows: predict {raw_ms:.3f} ms, calibrated {cal_ms:.3f} ms "
+              f"({cal_ms - raw_ms:+.3f} ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+# ==============================================================================
+# bench_daily_labels.py - Vectorized daily peak labels vs the notebook's apply
+# ==============================================================================
+# Run from the project root:
+#     python benchmarks/bench_daily_labels.py [--sensor-years 1 10 100]
+import argparse
+import os
+import sys
+import time
+import warnings
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import numpy as np
+import pandas as pd
+
+from melakago.labels import daily_peak_category
+
+
+def assign_daily_peak_category(day_group):
+    """Verbatim from section 2 of 03_FinalModellingPhase.ipynb."""
+    peak_threshold = day_group['total_traffic'].quantile(0.75)  # Top 25% are Peak
+    off_peak_threshold = day_group['total_traffic'].quantile(0.25) # Bottom 25% are Off-Peak
+
+    conditions = [
+        day_group['total_traffic'] >= peak_threshold,
+        day_group['total_traffic'] < off_peak_threshold
+    ]
+    choices = ['Peak', 'Off-Peak']
+
+    day_group['peak_category_daily'] = np.select(conditions, choices, default='Shoulder')
+    return day_group
+
+
+def notebook_labels(df):
+    warnings.filterwarnings('ignore', category=DeprecationWarning)  # apply on grouping columns
+    keys = [df['datetime'].dt.date, df['sensor_id']]
+    return df.groupby(keys, group_keys=False).apply(assign_daily_peak_category)['peak_category_daily']
+
+
+def sensor_years(source, n, rng, noisy=False):
+    """``n`` copies of a year of hourly counts, one per sensor, with jittered traffic."""
+    frames = []
+    for sensor in range(n):
+        frame = source[['datetime', 'total_traffic']].copy()
+        scale = rng.uniform(0.5, 1.5, len(frame))
+        frame['total_traffic'] = (frame['total_traffic'] * scale).round()
+        if noisy:
+            frame['total_traffic'] += rng.normal(0, 1, len(frame))
+            frame.loc[rng.random(len(frame)) < 0.01, 'total_traffic'] = np.nan
+        frame['sensor_id'] = sensor
+        frames.append(frame)
+    return pd.concat(frames, ignore_index=True)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sensor-years', type=int, nargs='+', default=[1, 10, 100])
+    args = parser.parse_args()
+    source = pd.read_csv(os.path.join(ROOT, 'traffic_with_weather_modified.csv'), parse_dates=['datetime'])
+    rng = np.random.default_rng(0)
+
+    # Parity: the real year, integer and float/NaN synthetic traffic
+    df = source.assign(sensor_id=0)
+    assert (daily_peak_category(df, by='sensor_id') == notebook_labels(df).to_numpy()).all()
+    df = sensor_years(source, 3, rng, noisy=True)
+    assert (daily_peak_category(df, by='sensor_id') == notebook_labels(df).to_numpy()).all()
+    print("parity: identical to assign_daily_peak_category (real year, float + NaN traffic)")
+
+    print(f"{'sensor-years':>12} {'rows':>9} {'groupby.apply':>14} {'vectorized':>11} {'speedup':>8}")
+    for n in args.sensor_years:
+        df = sensor_years(source, n, rng)
+        start = time.perf_counter()
+        expected = notebook_labels(df).to_numpy()
+        reference = time.perf_counter() - start
+        start = time.perf_counter()
+        labels = daily_peak_category(df, by='sensor_id')
+        vectorized = time.perf_counter() - start
+        assert (labels == expected).all()
+        print(f"{n:>12} {len(df):>9} {reference:>13.2f}s {vectorized:>10.3f}s {reference / vectorized:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
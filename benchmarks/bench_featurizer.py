@@ -0,0 +1,84 @@
+# ==============================================================================
+# bench_featurizer.py - Featurizer per-call timings against pandas + preprocessor.transform
+# ==============================================================================
+# Run from the project root:
+#     python benchmarks/bench_featurizer.py
+#
+# Timing only; exactness against preprocessor.transform is covered by
+# tests/test_featurizer.py.
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from melakago.features import MONTH_MAP, Featurizer
+
+REPEATS = 200
+
+
+def pandas_features(hour, day_of_week, month, is_weekend, is_holiday_mlk,
+                    temperature_2m, relative_humidity_2m, weathercode, windspeed_10m):
+    """The original X_live construction from app.py, generalised to n rows."""
+    X_live = pd.DataFrame(index=pd.RangeIndex(len(hour)))
+    X_live['hour'] = hour
+    X_live['day_of_week'] = day_of_week
+    X_live['month'] = month
+    X_live['is_weekend'] = is_weekend
+    X_live['is_holiday_mlk'] = is_holiday_mlk
+    X_live['temperature_2m'] = temperature_2m
+    X_live['relative_humidity_2m'] = relative_humidity_2m
+    X_live['weathercode'] = weathercode
+    X_live['windspeed_10m'] = windspeed_10m
+    X_live['hour_sin'] = np.sin(2 * np.pi * X_live['hour'] / 24)
+    X_live['hour_cos'] = np.cos(2 * np.pi * X_live['hour'] / 24)
+    X_live['month_num'] = X_live['month'].apply(lambda x: MONTH_MAP.get(x, 1))
+    X_live['month_sin'] = np.sin(2 * np.pi * X_live['month_num'] / 12)
+    X_live['month_cos'] = np.cos(2 * np.pi * X_live['month_num'] / 12)
+    return X_live.drop(['hour', 'month', 'month_num'], axis=1)
+
+
+def columns_of(df):
+    return dict(
+        hour=df['hour'].to_numpy(),
+        day_of_week=df['day_of_week'].to_numpy(),
+        is_weekend=df['is_weekend'].to_numpy(),
+        is_holiday_mlk=df['is_holiday_mlk'].to_numpy(),
+        temperature_2m=df['temperature_2m'].to_numpy(),
+        relative_humidity_2m=df['relative_humidity_2m'].to_numpy(),
+        weathercode=df['weathercode'].to_numpy(),
+        windspeed_10m=df['windspeed_10m'].to_numpy(),
+    )
+
+
+def best_of(fn, repeats=REPEATS):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    preprocessor = joblib.load('preprocessor.joblib')
+    featurizer = Featurizer(preprocessor)
+    df = pd.read_csv('dashboard_data.csv')
+
+    print(f"{'rows':>6} {'pandas + transform':>20} {'Featurizer':>12} {'speedup':>8}")
+    for n_rows in [1, 24]:
+        part = df.iloc[:n_rows]
+        part_columns = columns_of(part)
+        months, month_nums = part['month'].to_numpy(), part['month'].map(MONTH_MAP).to_numpy()
+        buffer = np.empty((n_rows, featurizer.n_features_out_), dtype=np.float32)
+        before = best_of(lambda: preprocessor.transform(pandas_features(month=months, **part_columns)))
+        after = best_of(lambda: featurizer.transform(month=month_nums, out=buffer, **part_columns))
+        print(f"{n_rows:>6} {before * 1e3:>18.3f}ms {after * 1e3:>10.3f}ms {before / after:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+# ==============================================================================
+# bench_forest_engine.py - CompiledForest latency against sklearn's predict_proba
+# ==============================================================================
+# Run from the project root (needs the three .joblib artifacts):
+#     python benchmarks/bench_forest_engine.py
+#
+# Timing only; parity with sklearn (NaN routing included) is covered by
+# tests/test_forest.py.
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from melakago.features import MONTH_MAP
+from melakago.forest import CompiledForest
+
+BATCH_SIZES = [1, 24, 10_000]
+REPEATS = 10
+
+
+def load_history_features(preprocessor):
+    """Preprocessed feature matrix for every row of dashboard_data.csv."""
+    df = pd.read_csv('dashboard_data.csv')
+    X = df[['temperature_2m', 'relative_humidity_2m', 'weathercode', 'windspeed_10m',
+            'is_weekend', 'is_holiday_mlk', 'day_of_week']].copy()
+    X['hour_sin'] = np.sin(2 * np.pi * df['hour'] / 24)
+    X['hour_cos'] = np.cos(2 * np.pi * df['hour'] / 24)
+    month_num = df['month'].map(MONTH_MAP)
+    X['month_sin'] = np.sin(2 * np.pi * month_num / 12)
+    X['month_cos'] = np.cos(2 * np.pi * month_num / 12)
+    return np.asarray(preprocessor.transform(X))
+
+
+def best_of(fn, X):
+    timings = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        fn(X)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    preprocessor = joblib.load('preprocessor.joblib')
+    X_history = load_history_features(preprocessor)
+    rng = np.random.default_rng(42)
+    X_batch = X_history[rng.integers(0, len(X_history), max(BATCH_SIZES))]
+
+    for name, path in [("jam", 'model_jam_classifier.joblib'), ("peak", 'model_peak_classifier.joblib')]:
+        forest = joblib.load(path)
+        start = time.perf_counter()
+        compiled = CompiledForest(forest)
+        print(f"\n{name}: flattened {len(compiled.is_leaf)} nodes in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+        print(f"{'batch':>8} {'sklearn':>12} {'compiled':>12} {'speedup':>8}")
+        for size in BATCH_SIZES:
+            X = X_batch[:size]
+            sk = best_of(forest.predict_proba, X)
+            cf = best_of(compiled.predict_proba, X)
+            print(f"{size:>8} {sk * 1000:>10.2f}ms {cf * 1000:>10.2f}ms {sk / cf:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+# ==============================================================================
+# bench_heatmap.py - 7 x 24 congestion heatmap: one batch vs one prediction per cell
+# ==============================================================================
+# Run from the project root (needs the three .joblib artifacts):
+#     python benchmarks/bench_heatmap.py
+import os
+import sys
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_best_time import best_of, horizon_from_history, hour_by_hour
+from melakago.predict import Predictor
+from melakago.search import HEATMAP_DAYS, score_hours
+
+
+def main():
+    predictor = Predictor.load()
+    weather = horizon_from_history(predictor, date(2024, 3, 1), HEATMAP_DAYS)
+
+    scored = score_hours(predictor, weather)
+    reference = hour_by_hour(predictor, weather)
+    assert (scored['jam_probability'].to_numpy() == reference['jam_probability'].to_numpy()).all()
+    assert (scored['peak_category'].to_numpy() == reference['peak_category'].to_numpy()).all()
+    print(f"parity: {len(scored)} batched cells match single-hour predictions")
+
+    single, _ = best_of(lambda: hour_by_hour(predictor, weather), repeats=1)
+    batch, _ = best_of(lambda: score_hours(predictor, weather))
+    print(f"{len(weather)} single-hour predictions : {single * 1000:8.1f} ms")
+    print(f"one batch of {len(weather)} rows        : {batch * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
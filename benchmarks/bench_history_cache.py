@@ -0,0 +1,78 @@
+# ==============================================================================
+# bench_history_cache.py - Cold-start time and memory: CSV vs Feather cache
+# ==============================================================================
+# Run from the project root:
+#     python benchmarks/bench_history_cache.py
+# Each load runs in a fresh interpreter so the numbers reflect a cold start.
+import os
+import subprocess
+import sys
+import tempfile
+
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from melakago.data import build_history_cache
+
+LOADERS = {
+    "csv (old)": (
+        "import pandas as pd\n"
+        "df = pd.read_csv(PATH)\n"
+        "df['datetime'] = pd.to_datetime(df['datetime'])\n"
+    ),
+    "feather cache": (
+        "from melakago.data import load_history\n"
+        "df = load_history(PATH)\n"
+    ),
+}
+
+PROBE = """
+import resource, sys, time
+sys.path.insert(0, {root!r})
+PATH = {path!r}
+import pandas, pyarrow.feather
+def rss_mb():
+    with open('/proc/self/statm') as f:
+        return int(f.read().split()[1]) * resource.getpagesize() / 1e6
+before = rss_mb()
+start = time.perf_counter()
+{loader}
+elapsed = time.perf_counter() - start
+print(elapsed, rss_mb() - before, df.memory_usage(deep=True).sum() / 1e6)
+"""
+
+
+def measure(loader, path):
+    code = PROBE.format(root=ROOT, path=path, loader=loader)
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    elapsed, rss, frame = map(float, out.stdout.split())
+    return elapsed, rss, frame
+
+
+def synthetic_history(df, years):
+    """Repeat the 1-year history with shifted timestamps."""
+    return pd.concat(
+        [df.assign(datetime=df['datetime'] + pd.DateOffset(years=k)) for k in range(years)],
+        ignore_index=True,
+    )
+
+
+def main():
+    base = pd.read_csv(os.path.join(ROOT, 'dashboard_data.csv'), parse_dates=['datetime'])
+    with tempfile.TemporaryDirectory() as tmp:
+        for years in [1, 10]:
+            csv_path = os.path.join(tmp, f'history_{years}y.csv')
+            synthetic_history(base, years).to_csv(csv_path, index=False)
+            build_history_cache(csv_path)
+
+            print(f"\n{years}-year history ({len(base) * years} rows)")
+            print(f"{'loader':>14} {'load':>10} {'RSS delta':>11} {'frame':>10}")
+            for name, loader in LOADERS.items():
+                elapsed, rss, frame = min(measure(loader, csv_path) for _ in range(3))
+                print(f"{name:>14} {elapsed * 1000:>8.0f}ms {rss:>9.1f}MB {frame:>8.1f}MB")
+
+
+if __name__ == "__main__":
+    main()
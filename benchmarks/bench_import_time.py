@@ -0,0 +1,55 @@
+# ==============================================================================
+# bench_import_time.py - Cold import time of the core package vs app.py
+# ==============================================================================
+# Run from the project root:
+#     python benchmarks/bench_import_time.py
+# Every import runs in a fresh interpreter; the best of REPEATS is reported.
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REPEATS = 5
+
+TARGETS = [
+    ("import melakago", "import melakago"),
+    ("from melakago import Predictor", "from melakago import Predictor"),
+    ("import melakago.advice", "import melakago.advice"),
+    ("import melakago.forecast", "import melakago.forecast"),
+    ("import melakago.api", "import melakago.api"),
+    ("import app (bare Streamlit)", "import app"),
+]
+
+SNIPPET = """
+import logging, time
+logging.disable(logging.CRITICAL)
+start = time.perf_counter()
+{statement}
+elapsed = time.perf_counter() - start
+import sys
+heavy = [m for m in ('numpy', 'pandas', 'sklearn', 'joblib', 'requests', 'streamlit') if m in sys.modules]
+print(elapsed, ','.join(heavy))
+"""
+
+
+def time_import(statement):
+    best, heavy = float('inf'), ''
+    for _ in range(REPEATS):
+        output = subprocess.run(
+            [sys.executable, '-c', SNIPPET.format(statement=statement)],
+            cwd=ROOT, capture_output=True, text=True, check=True,
+        ).stdout.split()
+        best = min(best, float(output[0]))
+        heavy = output[1] if len(output) > 1 else '-'
+    return best, heavy
+
+
+def main():
+    print(f"{'statement':<32} {'best ms':>8}  heavy modules loaded")
+    for label, statement in TARGETS:
+        best, heavy = time_import(statement)
+        print(f"{label:<32} {best * 1000:>8.1f}  {heavy}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+# ==============================================================================
+# bench_joint_model.py - Two forests vs one joint forest: accuracy and latency
+# ==============================================================================
+# Run from the project root:
+#     python benchmarks/bench_joint_model.py
+#
+# Both setups are trained on the same rows and scored on the same held-out
+# rows (one split, stratified on the jam / peak pair), each with SMOTE and
+# the notebook's forest parameters. Latency is per request through
+# CompiledForest, as Predictor serves them.
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import numpy as np
+from imblearn.over_sampling import SMOTE
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.metrics import accuracy_score, f1_score
+from sklearn.model_selection import train_test_split
+
+from melakago.forest import CompiledForest
+from melakago.joint import JointModel, joint_codes
+from melakago.train import (NOTEBOOK_PARAMS, PREPARE_CONFIG, SOURCE_CSV, build_preprocessor, feature_frame,
+                            load_training_frame)
+
+BATCH_SIZES = [1, 24]
+REPEATS = 300
+SEED = PREPARE_CONFIG['random_state']
+
+
+def forest():
+    return RandomForestClassifier(random_state=SEED, n_jobs=-1, **NOTEBOOK_PARAMS)
+
+
+def median_ms(fn, X):
+    timings = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        fn(X)
+        timings.append(time.perf_counter() - start)
+    return sorted(timings)[len(timings) // 2] * 1000
+
+
+def main():
+    df = load_training_frame(os.path.join(ROOT, SOURCE_CSV))
+    X = build_preprocessor().fit_transform(feature_frame(df)).astype(np.float32)
+    jam, peak = df['is_jam'].to_numpy(), df['peak_category_daily'].to_numpy()
+    pairs = joint_codes(jam, peak, np.unique(jam), np.unique(peak))
+    train, test = train_test_split(np.arange(len(df)), test_size=PREPARE_CONFIG['test_size'],
+                                   random_state=SEED, stratify=pairs)
+
+    start = time.perf_counter()
+    rf_jam = forest().fit(*SMOTE(random_state=SEED).fit_resample(X[train], jam[train]))
+    rf_peak = forest().fit(*SMOTE(random_state=SEED).fit_resample(X[train], peak[train]))
+    two_fit = time.perf_counter() - start
+
+    start = time.perf_counter()
+    X_joint, y_joint = SMOTE(random_state=SEED).fit_resample(X[train], pairs[train])
+    classes = np.unique(jam), np.unique(peak)
+    joint = JointModel(forest().fit(X_joint, y_joint), *classes)
+    joint_fit = time.perf_counter() - start
+
+    two_jam, two_peak = rf_jam.predict(X[test]), rf_peak.predict(X[test])
+    joint_jam, joint_peak = joint.jam.predict(X[test]), joint.peak.predict(X[test])
+    print(f"{len(train)} training rows, {len(test)} test rows")
+    print(f"{'':<12} {'jam acc':>8} {'jam F1':>8} {'peak acc':>9} {'peak F1':>8} {'fit':>6}")
+    for name, (p_jam, p_peak), fit in [("two models", (two_jam, two_peak), two_fit),
+                                       ("joint", (joint_jam, joint_peak), joint_fit)]:
+        print(f"{name:<12} {accuracy_score(jam[test], p_jam):8.4f} {f1_score(jam[test], p_jam, average='macro'):8.4f} "
+              f"{accuracy_score(peak[test], p_peak):9.4f} {f1_score(peak[test], p_peak, average='macro'):8.4f} "
+              f"{fit:5.1f}s")
+
+    compiled_jam, compiled_peak, compiled_joint = CompiledForest(rf_jam), CompiledForest(rf_peak), joint.compiled()
+    assert all(np.allclose(a, b) for a, b in zip(compiled_joint.predict_proba(X[test]), joint.predict_proba(X[test])))
+    nodes = {"two models": sum(e.tree_.node_count for m in (rf_jam, rf_peak) for e in m.estimators_),
+             "joint": sum(e.tree_.node_count for e in joint.model.estimators_)}
+    print(f"tree nodes: two models {nodes['two models']:,}, joint {nodes['joint']:,}")
+    for size in BATCH_SIZES:
+        X_batch = X[test][:size]
+        two = median_ms(lambda rows: (compiled_jam.predict_proba(rows), compiled_peak.predict_proba(rows)), X_batch)
+        one = median_ms(compiled_joint.predict_proba, X_batch)
+        print(f"{size:>2} row(s) per request: two models {two:.3f} ms, joint {one:.3f} ms ({two / one:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
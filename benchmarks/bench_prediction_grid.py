@@ -0,0 +1,56 @@
+# ==============================================================================
+# bench_prediction_grid.py - 24 single-row predictions vs one batched day grid
+# ==============================================================================
+# Run from the project root (needs the three .joblib artifacts):
+#     python benchmarks/bench_prediction_grid.py
+import os
+import sys
+import time
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from melakago.predict import Predictor
+
+REPEATS = 20
+
+
+def predict_hour_by_hour(predictor, weather_by_hour, selected_date, is_holiday):
+    """The pre-grid approach: one featurize + two predicts per selected hour."""
+    results = []
+    for hour in weather_by_hour.index:
+        X_live_processed = predictor.featurize_day(weather_by_hour.loc[[hour]], selected_date, is_holiday)
+        results.append((predictor.model_jam.predict(X_live_processed)[0],
+                        predictor.model_peak.predict(X_live_processed)[0]))
+    return results
+
+
+def best_of(fn, *args):
+    timings = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        result = fn(*args)
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def main():
+    selected_date = date(2024, 3, 5)
+    predictor = Predictor.load()
+    history = predictor.history
+    weather_by_hour = history.day_weather(selected_date)
+    is_holiday = history.is_holiday(selected_date)
+
+    single, single_result = best_of(predict_hour_by_hour, predictor, weather_by_hour, selected_date, is_holiday)
+    batched, grid = best_of(predictor.predict_day_grid, weather_by_hour, selected_date, is_holiday)
+
+    batched_result = list(zip(grid['is_jam'], grid['peak_category']))
+    assert single_result == batched_result, "batched grid disagrees with per-hour predictions"
+
+    print(f"24 x single-row predict : {single * 1000:8.1f} ms")
+    print(f"1 x batched 24-row grid : {batched * 1000:8.1f} ms")
+    print(f"speedup                 : {single / batched:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+# ==============================================================================
+# bench_rerun_bytes.py - Bytes the dashboard sends to the browser per rerun
+# ==============================================================================
+# Run from the project root (needs the three .joblib artifacts):
+#     python benchmarks/bench_rerun_bytes.py
+#
+# Runs app.py headlessly with streamlit's AppTest and sums the serialized
+# size of every ForwardMsg (the websocket payload) of a widget-triggered
+# rerun, split by element type. The hour is picked in the browser (see
+# components/hour_scrubber), so the rerun measured is a location change.
+# Weather requests fail fast offline, which only adds an error box.
+import os
+import sys
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from streamlit.runtime.forward_msg_queue import ForwardMsgQueue
+from streamlit.testing.v1 import AppTest
+
+os.environ.setdefault("OPEN_METEO_URL", "http://127.0.0.1:9/v1/forecast")
+
+sent = Counter()
+_enqueue = ForwardMsgQueue.enqueue
+
+
+def counting_enqueue(self, msg):
+    kind = msg.WhichOneof('type')
+    if kind == 'delta' and msg.delta.WhichOneof('type') == 'new_element':
+        element = msg.delta.new_element
+        kind = element.WhichOneof('type')
+        if kind == 'markdown' and '<style' in element.markdown.body:
+            kind = 'markdown (<style>)'
+        elif kind == 'markdown' and 'base64,' in element.markdown.body:
+            kind = 'markdown (inline image)'
+    sent[kind] += msg.ByteSize()
+    _enqueue(self, msg)
+
+
+def main():
+    ForwardMsgQueue.enqueue = counting_enqueue
+    app_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+    at = AppTest.from_file(app_path, default_timeout=120)
+    at.run()
+    for location in ("Jasin", "Alor Gajah"):
+        sent.clear()
+        at.sidebar.selectbox[0].set_value(location).run()
+    assert not at.exception, at.exception
+    total = sum(sent.values())
+    print(f"bytes sent by one location change: {total:,}")
+    for kind, size in sent.most_common(8):
+        print(f"  {kind:24s} {size:8,d}")
+
+
+if __name__ == "__main__":
+    main()
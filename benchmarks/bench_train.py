@@ -0,0 +1,47 @@
+# ==============================================================================
+# bench_train.py - Prep cache hit vs miss and search wall time by worker count
+# ==============================================================================
+# Run from the project root:
+#     python benchmarks/bench_train.py [--workers 1 4]
+#
+# Builds the prep cache in a temporary directory (miss), loads it again
+# (hit), then times the full hyperparameter search on 1 and N processes.
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from melakago.train import PARAM_GRID, SOURCE_CSV, load_or_prepare, param_candidates, search
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--workers', type=int, nargs='+', default=sorted({1, os.cpu_count()}))
+    args = parser.parse_args()
+
+    source = os.path.join(ROOT, SOURCE_CSV)
+    candidates = param_candidates(PARAM_GRID)
+    print(f"{os.cpu_count()} CPUs, {len(candidates)} candidates x 2 targets")
+    with tempfile.TemporaryDirectory() as cache_dir:
+        for label in ('miss', 'hit'):
+            start = time.perf_counter()
+            path, _ = load_or_prepare(source, cache_dir)
+            print(f"prep cache {label}: {time.perf_counter() - start:.2f}s")
+
+        baseline = None
+        for workers in args.workers:
+            start = time.perf_counter()
+            results = search(path, candidates, workers)
+            elapsed = time.perf_counter() - start
+            baseline = baseline or elapsed
+            fit_total = sum(result['fit_seconds'] for result in results)
+            print(f"search on {workers} worker(s): {elapsed:.1f}s wall, {fit_total:.1f}s of fits, "
+                  f"{baseline / elapsed:.2f}x vs {args.workers[0]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+# ==============================================================================
+# bench_weather_client.py - WeatherClient against a local stand-in Open-Meteo
+# ==============================================================================
+# Run from the project root (no network needed):
+#     python benchmarks/bench_weather_client.py
+#
+# Serves fixtures/open_meteo_horizon.json, a 16-day single-location response
+# in Open-Meteo's format whose last hours carry nulls as the real API's
+# tail does, from an HTTP/1.1 server on a free port, and checks:
+# - the horizon parses and slices into 24 hourly rows per date
+# - consecutive requests (and the multi-location request) reuse one connection
+# - 503s are retried through, persistent 503s and read timeouts raise
+#   RequestException after the configured number of attempts
+import json
+import os
+import sys
+import threading
+import time
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import requests
+
+from melakago.weather import FORECAST_HORIZON_DAYS, WeatherClient, parse_hourly, slice_date
+
+FIXTURE = os.path.join(ROOT, 'benchmarks', 'fixtures', 'open_meteo_horizon.json')
+READ_TIMEOUT = 0.5
+
+
+class StandIn(BaseHTTPRequestHandler):
+    """Answers /v1/forecast with the fixture; ``server.script`` queues 503s or delays."""
+
+    protocol_version = 'HTTP/1.1'  # keep-alive, so connection reuse is observable
+
+    def do_GET(self):
+        server = self.server
+        server.requests += 1
+        server.connections.add(self.client_address)
+        action = server.script.pop(0) if server.script else None
+        if action == 'slow':
+            time.sleep(READ_TIMEOUT * 3)
+        if action == 503:
+            body = b'{"error": true, "reason": "Service unavailable"}'
+            self.send_response(503)
+        else:
+            query = parse_qs(urlsplit(self.path).query)
+            points = len(query['latitude'][0].split(','))
+            body = json.dumps(server.fixture if points == 1 else [server.fixture] * points).encode()
+            self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        try:
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # the client gave up on a slow response
+
+    def log_message(self, *args):
+        pass
+
+
+def start_server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StandIn)
+    with open(FIXTURE) as f:
+        server.fixture = json.load(f)
+    server.requests, server.connections, server.script = 0, set(), []
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def reset(server, script=()):
+    server.requests, server.connections, server.script = 0, set(), list(script)
+
+
+def main():
+    server = start_server()
+    url = f"http://127.0.0.1:{server.server_address[1]}/v1/forecast"
+    times = server.fixture['hourly']['time']
+    start, end = times[0][:10], times[-1][:10]
+    client = WeatherClient(base_url=url, read_timeout=READ_TIMEOUT, backoff_factor=0.01)
+
+    # Horizon parsing and per-date slicing
+    forecast_df = parse_hourly(client.fetch_forecast_json(2.1935, 102.2496, start, end))
+    assert len(forecast_df) == FORECAST_HORIZON_DAYS * 24
+    assert {'weathercode', 'windspeed_10m', 'datetime'} <= set(forecast_df.columns)
+    for offset in range(FORECAST_HORIZON_DAYS):
+        day = slice_date(forecast_df, date.fromisoformat(start) + timedelta(days=offset))
+        assert list(day['datetime'].dt.hour) == list(range(24)), offset
+    assert forecast_df['weathercode'].isna().sum() == 6  # the fixture's null tail survives parsing
+    print(f"parse/slice: {len(forecast_df)} rows -> {FORECAST_HORIZON_DAYS} days x 24 hours")
+
+    # Connection reuse
+    reset(server)
+    for _ in range(5):
+        client.fetch_forecast_json(2.1935, 102.2496, start, end)
+    responses = client.fetch_forecast_json_many([(2.1935, 102.2496), (2.2760, 102.2921)], start, end)
+    assert len(responses) == 2
+    assert server.requests == 6 and len(server.connections) == 1, (server.requests, server.connections)
+    print(f"keep-alive: {server.requests} requests over {len(server.connections)} connection")
+
+    # Transient 503s are retried through
+    reset(server, [503, 503])
+    client.fetch_forecast_json(2.1935, 102.2496, start, end)
+    assert server.requests == 3, server.requests
+    print(f"503 x2: succeeded after {server.requests} attempts")
+
+    # Persistent 503s raise after 1 + retries attempts
+    reset(server, [503] * 5)
+    try:
+        client.fetch_forecast_json(2.1935, 102.2496, start, end)
+    except requests.exceptions.RequestException as e:
+        assert server.requests == 3, server.requests
+        print(f"503 x5: {type(e).__name__} after {server.requests} attempts")
+    else:
+        raise AssertionError("persistent 503s did not raise")
+
+    # Read timeouts raise after 1 + retries attempts, each bounded by the read timeout
+    reset(server, ['slow'] * 3)
+    started = time.perf_counter()
+    try:
+        client.fetch_forecast_json(2.1935, 102.2496, start, end)
+    except requests.exceptions.RequestException as e:
+        elapsed = time.perf_counter() - started
+        assert server.requests == 3, server.requests
+        assert elapsed < 3 * READ_TIMEOUT + 1.0, elapsed
+        print(f"read timeout: {type(e).__name__} after {server.requests} attempts in {elapsed:.2f}s")
+    else:
+        raise AssertionError("slow responses did not time out")
+
+    client.close()
+    server.shutdown()
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+# ==============================================================================
+# bench_worker_memory.py - Resident memory per worker: private vs memory-mapped forests
+# ==============================================================================
+# Run from the project root (Linux; needs the three .joblib artifacts):
+#     python benchmarks/bench_worker_memory.py [--workers 1 4 16]
+#
+# Starts N fresh worker processes that each load the models, touch every
+# node array (as a long-running worker eventually does) and predict a day.
+# All N then report their memory while alive together. "private" is the
+# previous loading (unpickle the forests, compile them in each process);
+# "mmap" is Predictor.load, which maps the shared .compiled.joblib dumps.
+# RSS counts shared pages in every process; PSS splits them between the
+# processes sharing them, so N x PSS is what the host actually spends.
+import argparse
+import multiprocessing
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+MODES = ['private', 'mmap']
+
+
+def memory_mb():
+    """(RSS, PSS) of this process in MB, from /proc."""
+    values = {}
+    with open('/proc/self/smaps_rollup') as f:
+        for line in f:
+            parts = line.split()
+            if parts[0] in ('Rss:', 'Pss:'):
+                values[parts[0]] = int(parts[1]) / 1024
+    return values['Rss:'], values['Pss:']
+
+
+def load_predictor(mode):
+    import joblib
+
+    from melakago.features import Featurizer
+    from melakago.forest import CompiledForest
+    from melakago.predict import MODEL_JAM_FILE, MODEL_PEAK_FILE, PREPROCESSOR_FILE, Predictor
+
+    if mode == 'mmap':
+        return Predictor.load(history_csv=None, calibrated=False)
+    return Predictor(CompiledForest(joblib.load(MODEL_JAM_FILE)), CompiledForest(joblib.load(MODEL_PEAK_FILE)),
+                     Featurizer(joblib.load(PREPROCESSOR_FILE)), None, None)
+
+
+def worker(mode, loaded, measured, results):
+    import numpy as np
+
+    os.chdir(ROOT)
+    baseline = memory_mb()[0]
+    predictor = load_predictor(mode)
+    for model in (predictor.model_jam, predictor.model_peak):
+        for array in (model.feature, model.threshold, model.children, model.value, model.is_leaf):
+            array.sum()  # fault in every page
+    X = predictor.featurizer.transform(hour=np.arange(24), day_of_week='Tuesday', month=3, is_weekend=False,
+                                       is_holiday_mlk=False, temperature_2m=27.0, relative_humidity_2m=80.0,
+                                       weathercode=3, windspeed_10m=6.0)
+    predictor.predict(X)
+    loaded.wait()  # every worker holds its models before anyone measures
+    rss, pss = memory_mb()
+    results.put((baseline, rss, pss))
+    measured.wait()
+
+
+def run(mode, n_workers):
+    context = multiprocessing.get_context('spawn')
+    loaded, measured = context.Barrier(n_workers), context.Barrier(n_workers + 1)
+    results = context.Queue()
+    processes = [context.Process(target=worker, args=(mode, loaded, measured, results)) for _ in range(n_workers)]
+    for process in processes:
+        process.start()
+    samples = [results.get() for _ in processes]
+    measured.wait()
+    for process in processes:
+        process.join()
+    baseline, rss, pss = (sum(values) / n_workers for values in zip(*samples))
+    return baseline, rss, pss
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 4, 16])
+    args = parser.parse_args()
+
+    os.chdir(ROOT)
+    from melakago.predict import Predictor
+    Predictor.load(history_csv=None)  # make sure the .compiled.joblib dumps exist
+
+    print(f"{'mode':<8} {'workers':>7} {'RSS/worker':>11} {'PSS/worker':>11} {'host total':>11} {'(interpreter)':>14}")
+    for n_workers in args.workers:
+        for mode in MODES:
+            baseline, rss, pss = run(mode, n_workers)
+            print(f"{mode:<8} {n_workers:>7} {rss:9.1f}MB {pss:9.1f}MB {pss * n_workers:9.1f}MB {baseline:12.1f}MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+# ==============================================================================
+# load_test_api.py - Throughput and tail latency of the headless prediction API
+# ==============================================================================
+# Run from the project root (needs the three .joblib artifacts). Starts the
+# API on a free port unless --url points at a running one:
+#     python benchmarks/load_test_api.py [--url http://127.0.0.1:8000]
+#                                        [--clients 8] [--duration 10] [--batch 1 24]
+import argparse
+import http.client
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+from datetime import date, datetime
+from urllib.parse import urlsplit
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from melakago.forecast import MELAKA_LOCATIONS
+
+# Historical dates keep the run independent of the live forecast API
+DATES = [date(2024, 3, 5), date(2024, 7, 13), date(2024, 12, 31), date(2023, 5, 1)]
+
+
+def random_query(rng):
+    when = datetime.combine(rng.choice(DATES), datetime.min.time()).replace(hour=rng.randrange(24))
+    return {'location': rng.choice(list(MELAKA_LOCATIONS)), 'datetime': when.isoformat()}
+
+
+def post(conn, payload):
+    body = json.dumps(payload).encode()
+    conn.request('POST', '/predict', body=body, headers={'Content-Type': 'application/json'})
+    response = conn.getresponse()
+    data = response.read()
+    if response.status != 200:
+        raise RuntimeError(f"HTTP {response.status}: {data[:200]!r}")
+    return json.loads(data)
+
+
+def check_parity(host, port):
+    """Answers from the API must match the dashboard's day grid for the same inputs."""
+    from melakago.predict import Predictor
+
+    predictor = Predictor.load(ROOT)
+    conn = http.client.HTTPConnection(host, port)
+    for selected_date in DATES:
+        grid, _ = predictor.day_grid(selected_date, use_forecast=False)
+        queries = [{'location': 'Bandar Hilir', 'datetime': f"{selected_date}T{hour:02d}:00"}
+                   for hour in grid.index]
+        predictions = post(conn, {'queries': queries})['predictions']
+        for hour, prediction in zip(grid.index, predictions):
+            assert prediction['is_jam'] == bool(grid.at[hour, 'is_jam']), (selected_date, hour)
+            assert prediction['peak_category'] == grid.at[hour, 'peak_category'], (selected_date, hour)
+    conn.close()
+
+
+def run_clients(host, port, clients, duration, batch):
+    latencies = [[] for _ in range(clients)]
+    deadline = time.perf_counter() + duration
+
+    def client(i):
+        rng = random.Random(i)
+        conn = http.client.HTTPConnection(host, port)
+        while time.perf_counter() < deadline:
+            queries = [random_query(rng) for _ in range(batch)]
+            payload = queries[0] if batch == 1 else {'queries': queries}
+            start = time.perf_counter()
+            post(conn, payload)
+            latencies[i].append(time.perf_counter() - start)
+        conn.close()
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    return np.concatenate([np.array(l) for l in latencies]), elapsed
+
+
+def start_server(workers):
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        port = s.getsockname()[1]
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'melakago.api', '--port', str(port), '--workers', str(workers)],
+        cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    for _ in range(600):
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=1)
+            conn.request('GET', '/health')
+            if conn.getresponse().status == 200:
+                return process, port
+        except OSError:
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError("API did not start")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--url')
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--clients', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--batch', type=int, nargs='+', default=[1, 24])
+    args = parser.parse_args()
+
+    process = None
+    if args.url:
+        url = urlsplit(args.url)
+        host, port = url.hostname, url.port or 80
+    else:
+        process, port = start_server(args.workers)
+        host = '127.0.0.1'
+    try:
+        check_parity(host, port)
+        print(f"{'batch':>5} {'requests/s':>11} {'predictions/s':>14} {'p50 ms':>8} {'p99 ms':>8}")
+        for batch in args.batch:
+            run_clients(host, port, args.clients, 1.0, batch)  # warm-up
+            latencies, elapsed = run_clients(host, port, args.clients, args.duration, batch)
+            rps = len(latencies) / elapsed
+            p50, p99 = np.percentile(latencies, [50, 99]) * 1000
+            print(f"{batch:>5} {rps:>11.0f} {rps * batch:>14.0f} {p50:>8.2f} {p99:>8.2f}")
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+
+if __name__ == "__main__":
+    main()
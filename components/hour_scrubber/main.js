@@ -0,0 +1,163 @@
+// Hour scrubber: shows any hour of a day's predictions without a server round trip.
+//
+// app.py renders it with one JSON payload per (location, date), built by
+// melakago/timeline.py:day_payload. Moving the slider or clicking an hour only
+// re-renders in this iframe. The component never sends a value back, so
+// scrubbing never reruns the script. It speaks the Streamlit custom component
+// (v1) postMessage protocol directly, so there is no build step.
+(function () {
+  "use strict";
+
+  var TRAFFIC = {
+    "Peak": { emoji: "🔴", color: "#dc2626", flow: "Heavy Traffic" },
+    "Shoulder": { emoji: "🟡", color: "#f59e0b", flow: "Moderate Flow" },
+    "Off-Peak": { emoji: "🟢", color: "#22c55e", flow: "Light Traffic" }
+  };
+  var SOURCES = {
+    "forecast": "🔴 Live weather forecast",
+    "pattern": "📊 Historical weather pattern (forecast unavailable)",
+    "historical": "📊 Historical weather data"
+  };
+
+  var payload = null;
+  var hour = null;
+  var $ = function (id) { return document.getElementById(id); };
+
+  function send(type, data) {
+    var message = { isStreamlitMessage: true, type: type };
+    for (var key in data) { message[key] = data[key]; }
+    window.parent.postMessage(message, "*");
+  }
+
+  function setFrameHeight() {
+    send("streamlit:setFrameHeight", { height: document.documentElement.scrollHeight });
+  }
+
+  function hourLabel(h) {
+    var twelve = h % 12 === 0 ? 12 : h % 12;
+    var pad = h < 10 ? "0" + h : "" + h;
+    return twelve + ":00 " + (h < 12 ? "AM" : "PM") + " (" + pad + ":00)";
+  }
+
+  function escapeHtml(text) {
+    var div = document.createElement("div");
+    div.textContent = text;
+    return div.innerHTML;
+  }
+
+  function card(label, icon, value, color, detail) {
+    return '<div class="label">' + label + '</div>' +
+      '<div class="icon">' + icon + '</div>' +
+      '<div class="value" style="color:' + color + '">' + escapeHtml(value) + '</div>' +
+      '<div class="detail">' + escapeHtml(detail) + '</div>';
+  }
+
+  // Forecast gaps arrive as null
+  function reading(value, digits, unit) {
+    return value === null ? "–" : value.toFixed(digits) + unit;
+  }
+
+  function jamColor(pct) {
+    // Green (no jam) through amber to red (jam certain)
+    return "hsl(" + Math.round(120 - 1.2 * pct) + ", 70%, 55%)";
+  }
+
+  function buildStrip() {
+    var strip = $("strip");
+    strip.innerHTML = "";
+    for (var h = 0; h < 24; h++) {
+      var i = payload.hours.indexOf(h);
+      var cell = document.createElement("button");
+      cell.type = "button";
+      cell.className = "scrubber-cell";
+      cell.dataset.hour = h;
+      if (i < 0) {
+        cell.className += " missing";
+        cell.disabled = true;
+      } else {
+        var peak = payload.peaks[payload.peak[i]];
+        cell.style.background = jamColor(payload.jam_pct[i]);
+        cell.textContent = peak === "Peak" ? "P" : peak === "Shoulder" ? "S" : "";
+        cell.title = hourLabel(h) + ": " + payload.jam_pct[i] + "% jam, " + peak;
+        cell.addEventListener("click", function (event) {
+          showHour(Number(event.currentTarget.dataset.hour));
+        });
+      }
+      strip.appendChild(cell);
+    }
+  }
+
+  function showHour(h) {
+    var i = payload.hours.indexOf(h);
+    if (i < 0) { return; }
+    hour = h;
+    $("slider").value = h;
+    $("time").textContent = hourLabel(h);
+
+    var cells = $("strip").children;
+    for (var c = 0; c < cells.length; c++) {
+      cells[c].classList.toggle("selected", Number(cells[c].dataset.hour) === h);
+    }
+
+    var jam = payload.jam[i] === 1;
+    var jamColorText = jam ? "#dc2626" : "#22c55e";
+    $("jam").innerHTML = card("🚦 Congestion Risk", jam ? "🚨" : "✅", jam ? "Jam Likely" : "No Jam",
+      jamColorText, payload.jam_pct[i] + "% jam likelihood · " + payload.jam_conf[i] + "% confidence");
+
+    var peak = payload.peaks[payload.peak[i]];
+    var traffic = TRAFFIC[peak] || TRAFFIC["Off-Peak"];
+    $("traffic").innerHTML = card("📊 Traffic Level", traffic.emoji, peak + " Hour", traffic.color,
+      traffic.flow + " · " + payload.peak_conf[i] + "% confidence");
+
+    var weather = payload.weather_kinds[payload.weather[i]];
+    $("weather").innerHTML = card("🌤️ Weather", weather[0], weather[1], weather[2],
+      reading(payload.temp[i], 1, "°C") + " · 💧 " + reading(payload.humidity[i], 0, "%") +
+      " · 💨 " + reading(payload.wind[i], 1, " km/h"));
+
+    var advice = payload.advice_kinds[payload.advice[i]];
+    var adviceBox = $("advice");
+    adviceBox.className = "scrubber-advice " + advice.risk_class;
+    adviceBox.innerHTML = "<p>" + advice.vehicle_icon + " " + escapeHtml(advice.vehicle_rec) + "</p>" +
+      "<p>" + advice.consequence_icon + " " + escapeHtml(advice.consequence_text) + "</p>";
+  }
+
+  function applyTheme(theme) {
+    if (!theme) { return; }
+    var style = document.documentElement.style;
+    if (theme.textColor) { style.setProperty("--text", theme.textColor); }
+    if (theme.primaryColor) { style.setProperty("--primary", theme.primaryColor); }
+    if (theme.font) { document.body.style.fontFamily = theme.font; }
+  }
+
+  function onRender(event) {
+    var data = event.data;
+    if (!data || data.type !== "streamlit:render") { return; }
+    applyTheme(data.theme);
+
+    var next = data.args.payload;
+    var sameDay = payload !== null && payload.date === next.date;
+    payload = next;
+    $("source").textContent = SOURCES[payload.source] || "";
+    buildStrip();
+
+    // Keep the scrubbed hour across re-renders of the same day
+    var start = sameDay ? hour : data.args.start_hour;
+    if (payload.hours.indexOf(start) < 0) { start = payload.hours[0]; }
+    $("root").hidden = false;
+    showHour(start);
+    setFrameHeight();
+  }
+
+  $("slider").addEventListener("input", function (event) {
+    var h = Number(event.target.value);
+    if (payload.hours.indexOf(h) >= 0) {
+      showHour(h);
+    } else {
+      event.target.value = hour;
+    }
+  });
+
+  window.addEventListener("message", onRender);
+  window.addEventListener("resize", setFrameHeight);
+  send("streamlit:componentReady", { apiVersion: 1 });
+})();
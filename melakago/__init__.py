@@ -0,0 +1,32 @@
+"""MelakaGo core: prediction logic shared by the Streamlit dashboard and tools.
+
+Nothing here imports Streamlit. The public names below are resolved on
+first access, so ``import melakago`` does not pull in NumPy or pandas:
+
+    from melakago import Predictor, travel_advice
+"""
+import importlib
+
+_EXPORTS = {
+    'Advice': 'advice',
+    'travel_advice': 'advice',
+    'SharedCache': 'cache',
+    'load_history': 'data',
+    'Featurizer': 'features',
+    'MELAKA_LOCATIONS': 'forecast',
+    'ForecastService': 'forecast',
+    'CompiledForest': 'forest',
+    'HistoryIndex': 'history',
+    'Predictor': 'predict',
+    'WeatherClient': 'weather',
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f"{__name__}.{_EXPORTS[name]}"), name)
+    globals()[name] = value
+    return value
@@ -0,0 +1,74 @@
+# ==============================================================================
+# advice.py - Travel recommendation rules and card styling for a prediction
+# ==============================================================================
+# Pure Python with no third-party imports, so it can be used anywhere.
+from typing import NamedTuple
+
+RAIN_WEATHERCODE = 61  # WMO codes from 61 up are rain, snow or storms
+
+
+class Advice(NamedTuple):
+    vehicle_rec: str
+    vehicle_icon: str
+    consequence_text: str
+    consequence_icon: str
+    risk_class: str
+
+
+def safe_get_value(data_row, column, default_value=None):
+    """Safely get value from DataFrame with fallback."""
+    try:
+        if data_row is not None and not data_row.empty and column in data_row.columns:
+            values = data_row[column].values
+            if len(values) > 0:
+                return values[0]
+    except (IndexError, KeyError, AttributeError):
+        pass
+    return default_value
+
+
+def format_reading(value, digits, unit):
+    """A weather reading for a card, or "–" where the forecast has a gap (NaN)."""
+    if value is None or value != value:
+        return "–"
+    return f"{value:.{digits}f}{unit}"
+
+
+def get_weather_icon_and_desc(weather_code):
+    """Return weather icon and description based on weather code."""
+    if weather_code >= RAIN_WEATHERCODE:
+        return "🌧️", "Rainy", "#dc2626"
+    elif weather_code >= 51:
+        return "🌦️", "Drizzle", "#6b7280"
+    elif weather_code >= 3:
+        return "☁️", "Cloudy", "#9ca3af"
+    else:
+        return "☀️", "Clear", "#fbbf24"
+
+
+def travel_advice(weathercode, peak_category):
+    """Vehicle recommendation and outlook for one hour's weather and traffic level."""
+    weathercode = weathercode if weathercode is not None else 0
+    if weathercode >= RAIN_WEATHERCODE:
+        return Advice(
+            "A car is recommended for safety due to rain in Malacca's narrow streets.", "🚗",
+            "Risk Warning: Motorcycle travel during rain can be dangerous on Malacca's historic cobblestone areas.", "⚠️",
+            "risk-warning",
+        )
+    if peak_category == "Peak":
+        return Advice(
+            "🏍️ A motorcycle is recommended to navigate through Malacca's busy heritage areas.", "🏍️",
+            "Risk Warning: Cars may face significant delays in Malacca's narrow heritage streets during peak hours.", "⚠️",
+            "risk-warning",
+        )
+    if peak_category == "Shoulder":
+        return Advice(
+            "🚗🏍️ Both vehicles are suitable for exploring Malacca comfortably.", "🚗🏍️",
+            "Outlook: Good time to visit Malacca's attractions with moderate traffic.", "✅",
+            "risk-good",
+        )
+    return Advice(
+        "🚗 Perfect time for a comfortable car journey through historic Malacca.", "🚗",
+        "Outlook: Excellent conditions for sightseeing in Malacca's heritage sites.", "✅",
+        "risk-good",
+    )
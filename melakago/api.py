@@ -0,0 +1,270 @@
+# ==============================================================================
+# api.py - Headless JSON prediction API over the dashboard's inference pipeline
+# ==============================================================================
+# Run from the project root (needs the three .joblib artifacts):
+#     python -m melakago.api [--host 127.0.0.1] [--port 8000] [--workers 1]
+#
+#   GET  /health   (with this worker's forecast cache hit / miss / stale counters)
+#   GET  /predict?location=Bandar%20Hilir&datetime=2024-03-05T17:00
+#   POST /predict  {"location": "Bandar Hilir", "datetime": "2024-03-05T17:00"}
+#   POST /predict  {"queries": [{"location": ..., "datetime": ...}, ...]}
+import argparse
+import json
+import logging
+import os
+import signal
+import sys
+import threading
+import time
+from datetime import date, datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+import requests
+
+from .cache import DEFAULT_CACHE_PATH, SharedCache
+from .forest import ensure_compiled
+from .forecast import MELAKA_LOCATIONS, ForecastService
+from .predict import WEATHER_DEFAULTS, Predictor
+from .weather import FORECAST_HORIZON_DAYS, OPEN_METEO_URL, WeatherClient
+
+logger = logging.getLogger(__name__)
+
+MAX_BATCH = 1000
+WEATHER_TTL = 3600  # same lifetime as the dashboard's prediction grids
+PATTERN_RETRY_TTL = 60  # a forecast that failed is retried at most this often per (location, date)
+
+
+class DayWeather:
+    """One day's hourly weather as NumPy columns, ready to featurize any subset of hours."""
+
+    def __init__(self, selected_date, weather_by_hour, source, is_holiday):
+        self.date = selected_date
+        self.source = source
+        self.is_holiday = bool(is_holiday)
+        self.rows = {hour: row for row, hour in enumerate(weather_by_hour.index.tolist())}
+        self.columns = {
+            column: (weather_by_hour[column].to_numpy() if column in weather_by_hour.columns
+                     else np.full(len(weather_by_hour), default_value))
+            for column, default_value in WEATHER_DEFAULTS.items()
+        }
+
+    def featurize(self, featurizer, hours):
+        """Feature rows for ``hours``; same values as ``Predictor.featurize_day``."""
+        rows = [self.rows[hour] for hour in hours]
+        return featurizer.transform(
+            hour=np.asarray(hours),
+            day_of_week=self.date.strftime('%A'),
+            month=self.date.month,
+            is_weekend=(self.date.weekday() >= 5),
+            is_holiday_mlk=self.is_holiday,
+            **{column: values[rows] for column, values in self.columns.items()},
+        )
+
+
+class PredictionService:
+    """Answers (location, datetime) queries with one featurize + predict pass per batch.
+
+    Queries are grouped by (location, date). Each day's hourly weather is
+    resolved the same way the dashboard does it (live forecast from today
+    on, falling back to the historical pattern; recorded weather before
+    today) and kept for ``weather_ttl`` seconds. Dates past the forecast
+    horizon go straight to the pattern; a pattern that stands in for a
+    failed forecast is kept for ``PATTERN_RETRY_TTL`` seconds, so an
+    outage costs one upstream request per (location, date) per interval.
+    """
+
+    def __init__(self, predictor, forecasts, locations=MELAKA_LOCATIONS, weather_ttl=WEATHER_TTL):
+        self.predictor = predictor
+        self.forecasts = forecasts
+        self.locations = dict(locations)
+        self.weather_ttl = weather_ttl
+        self._weather = {}  # (location, date) -> (expires_at, DayWeather)
+        self._weather_lock = threading.Lock()
+
+    @classmethod
+    def load(cls, model_dir='.'):
+        """Load the artifacts and connect to the same forecast cache as the dashboard."""
+        client = WeatherClient(base_url=os.environ.get("OPEN_METEO_URL", OPEN_METEO_URL))
+        cache = SharedCache(path=os.environ.get("MELAKAGO_CACHE_PATH", DEFAULT_CACHE_PATH), ttl=WEATHER_TTL)
+        joint = os.environ.get("MELAKAGO_JOINT_MODEL") == "1"  # uncalibrated; see Predictor.load
+        predictor = Predictor.load(model_dir, joint=joint, calibrated=not joint)
+        return cls(predictor, ForecastService(client, cache))
+
+    def parse_query(self, query):
+        """Validate one query; returns (location, datetime). Raises ValueError."""
+        if not isinstance(query, dict):
+            raise ValueError("Each query must be an object with 'location' and 'datetime'.")
+        location = query.get('location')
+        if not isinstance(location, str) or location not in self.locations:
+            raise ValueError(f"Unknown location {location!r}; expected one of {sorted(self.locations)}.")
+        try:
+            when = datetime.fromisoformat(query.get('datetime'))
+        except (TypeError, ValueError):
+            raise ValueError(f"Invalid datetime {query.get('datetime')!r}; use an ISO 8601 string.") from None
+        return location, when
+
+    def day_weather(self, location, selected_date):
+        """The hourly weather used for a (location, date), as a ``DayWeather``."""
+        key = (location, selected_date)
+        now = time.monotonic()
+        with self._weather_lock:
+            entry = self._weather.get(key)
+        if entry is not None and entry[0] > now:
+            return entry[1]
+
+        use_forecast = selected_date >= date.today()
+        in_horizon = use_forecast and (selected_date - date.today()).days < FORECAST_HORIZON_DAYS
+        forecast_df = None
+        if in_horizon:
+            lat, lon = self.locations[location]
+            try:
+                forecast_df = self.forecasts.for_date(lat, lon, selected_date.isoformat())
+            except requests.exceptions.RequestException:
+                logger.warning("Forecast unavailable for %s on %s", location, selected_date, exc_info=True)
+        weather = DayWeather(selected_date, *self.predictor.day_weather(selected_date, use_forecast, forecast_df),
+                             is_holiday=self.predictor.history.is_holiday(selected_date))
+        # A pattern standing in for a failed forecast is kept briefly, so the forecast is retried soon
+        ttl = PATTERN_RETRY_TTL if in_horizon and weather.source == "pattern" else self.weather_ttl
+        with self._weather_lock:
+            self._weather = {k: v for k, v in self._weather.items() if v[0] > now}
+            self._weather[key] = (now + ttl, weather)
+        return weather
+
+    def predict(self, queries):
+        """Predictions for a list of query dicts, in order. Raises ValueError on a bad query."""
+        parsed = [self.parse_query(query) for query in queries]
+        groups = {}
+        for i, (location, when) in enumerate(parsed):
+            groups.setdefault((location, when.date()), []).append(i)
+
+        blocks, order, sources = [], [], {}
+        for (location, selected_date), indices in groups.items():
+            weather = self.day_weather(location, selected_date)
+            hours = [parsed[i][1].hour for i in indices]
+            missing = set(hours).difference(weather.rows)
+            if missing:
+                raise ValueError(f"No weather for {location} on {selected_date} at hours {sorted(missing)}.")
+            blocks.append(weather.featurize(self.predictor.featurizer, hours))
+            order.extend(indices)
+            sources.update(dict.fromkeys(indices, weather.source))
+
+        result = self.predictor.predict(np.concatenate(blocks))
+        categories = [str(c) for c in self.predictor.model_peak.classes_]
+        predictions = [None] * len(parsed)
+        for row, i in enumerate(order):
+            location, when = parsed[i]
+            predictions[i] = {
+                'location': location,
+                'datetime': when.replace(minute=0, second=0, microsecond=0).isoformat(),
+                'is_jam': bool(result['is_jam'][row]),
+                'jam_probability': float(result['jam_probability'][row]),
+                'jam_confidence': float(result['jam_confidence'][row]),
+                'peak_category': str(result['peak_category'][row]),
+                'peak_probabilities': dict(zip(categories, result['peak_proba'][row].tolist())),
+                'peak_confidence': float(result['peak_confidence'][row]),
+                'weather_source': sources[i],
+            }
+        return predictions
+
+
+class PredictionHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, so clients can reuse connections
+    # Headers and body go out as separate writes; without TCP_NODELAY each
+    # response waits on the client's delayed ACK (~40 ms)
+    disable_nagle_algorithm = True
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _answer(self, payload):
+        service = self.server.service
+        try:
+            if isinstance(payload, dict) and 'queries' in payload:
+                queries = payload['queries']
+                if not isinstance(queries, list) or not 0 < len(queries) <= MAX_BATCH:
+                    raise ValueError(f"'queries' must be a list of 1 to {MAX_BATCH} queries.")
+                self._send_json(200, {'predictions': service.predict(queries)})
+            else:
+                self._send_json(200, service.predict([payload])[0])
+        except ValueError as e:
+            self._send_json(400, {'error': str(e)})
+        except Exception:
+            logger.exception("Failed to answer %r", payload)
+            self._send_json(500, {'error': "Internal error while predicting."})
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path == '/health':
+            self._send_json(200, {'status': 'ok', 'pid': os.getpid(),
+                                  'forecast_cache': self.server.service.forecasts.cache.stats()})
+        elif url.path == '/predict':
+            self._answer({key: values[0] for key, values in parse_qs(url.query).items()})
+        else:
+            self._send_json(404, {'error': f"Unknown path {url.path}"})
+
+    def do_POST(self):
+        if urlsplit(self.path).path != '/predict':
+            self._send_json(404, {'error': f"Unknown path {self.path}"})
+            return
+        try:
+            payload = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+        except ValueError:
+            self._send_json(400, {'error': "Request body must be JSON."})
+            return
+        self._answer(payload)
+
+    def log_message(self, format, *args):
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+
+def _run_worker(server, model_dir):
+    server.service = PredictionService.load(model_dir)
+    logger.info("Worker %d serving on %s:%d", os.getpid(), *server.server_address[:2])
+    server.serve_forever()
+
+
+def serve(host='127.0.0.1', port=8000, model_dir='.', workers=1):
+    """Serve the API. With ``workers > 1`` the listening socket is shared by forked processes,
+    each of which loads its own copy of the artifacts once."""
+    server = ThreadingHTTPServer((host, port), PredictionHandler)
+    server.daemon_threads = True
+    ensure_compiled(model_dir)  # so the workers map the same dumps instead of each rebuilding a stale one
+    children = []
+    for _ in range(workers - 1):
+        pid = os.fork()
+        if pid == 0:
+            try:
+                _run_worker(server, model_dir)
+            finally:
+                os._exit(0)
+        children.append(pid)
+    if children:
+        # Exit cleanly on SIGTERM so the workers are stopped too
+        signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    try:
+        _run_worker(server, model_dir)
+    finally:
+        for pid in children:
+            os.kill(pid, signal.SIGTERM)
+        server.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="MelakaGo headless prediction API")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--model-dir', default='.')
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    try:
+        serve(args.host, args.port, args.model_dir, args.workers)
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,157 @@
+# ==============================================================================
+# cache.py - SQLite-backed cache shared by every process on a host
+# ==============================================================================
+import json
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = os.path.join(tempfile.gettempdir(), "melakago_cache.sqlite3")
+
+
+class SharedCache:
+    """Persistent JSON cache with stale-while-revalidate.
+
+    Entries live in one SQLite file (WAL mode), so every worker process on
+    the host reads the same data and it survives restarts. ``get`` answers
+    as follows:
+
+    * fresh (younger than ``ttl``): a hit, returned as stored;
+    * stale (up to ``ttl + max_stale``): returned immediately, and a single
+      background refresh is started. A lease column makes sure only one
+      thread in one process refreshes a key at a time;
+    * missing or too old: a miss, fetched synchronously and stored.
+
+    Hit, miss and stale counts for this process are available from ``stats``.
+    Entries older than ``ttl + max_stale`` can no longer be served, so each
+    ``set`` deletes them; keys that embed a date do not pile up.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, ttl=3600, max_stale=86400, refresh_lease=60):
+        self.path = path
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self.refresh_lease = refresh_lease
+        self._counters = {'hit': 0, 'miss': 0, 'stale': 0, 'refresh_error': 0}
+        self._counter_lock = threading.Lock()
+        self._refresher = ThreadPoolExecutor(max_workers=2, thread_name_prefix="cache-refresh")
+        with closing(self._connect()) as conn, conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                " key TEXT PRIMARY KEY,"
+                " value TEXT NOT NULL,"
+                " fetched_at REAL NOT NULL,"
+                " refresh_until REAL NOT NULL DEFAULT 0)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS refetches ("
+                " key TEXT PRIMARY KEY,"
+                " requested_at REAL NOT NULL)"
+            )
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=5.0)
+
+    def _count(self, name):
+        with self._counter_lock:
+            self._counters[name] += 1
+
+    def stats(self):
+        """Snapshot of this process's hit / miss / stale / refresh_error counters."""
+        with self._counter_lock:
+            return dict(self._counters)
+
+    def _read(self, key):
+        with closing(self._connect()) as conn:
+            return conn.execute(
+                "SELECT value, fetched_at FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+
+    def set(self, key, value):
+        """Store a fresh value for ``key`` (used to prewarm entries fetched in bulk)."""
+        now = time.time()
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, fetched_at, refresh_until)"
+                " VALUES (?, ?, ?, 0)",
+                (key, json.dumps(value), now),
+            )
+            expired = now - self.ttl - self.max_stale
+            purged = conn.execute("DELETE FROM entries WHERE fetched_at < ?", (expired,)).rowcount
+            conn.execute("DELETE FROM refetches WHERE requested_at < ?", (expired,))
+        if purged:
+            logger.info("Purged %d expired cache entries; counters %s", purged, self.stats())
+
+    def fetched_at(self, key):
+        """When ``key`` was last fetched (epoch seconds), or None if it is not cached."""
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT fetched_at FROM entries WHERE key = ?", (key,)).fetchone()
+        return None if row is None else row[0]
+
+    def request_refetch(self, key, cooldown):
+        """Evict ``key`` so the next ``get`` fetches it again, at most once per ``cooldown``.
+
+        The cooldown runs from the later of the last fetch of ``key`` and
+        the last request, so it also holds while ``key`` is not cached (an
+        upstream outage, or a refetch that failed). Returns the number of
+        entries evicted (0 or 1) and the seconds left on the cooldown; a
+        request inside the cooldown changes nothing.
+        """
+        now = time.time()
+        with closing(self._connect()) as conn, conn:
+            conn.execute("BEGIN IMMEDIATE")  # check and record atomically across processes
+            last = conn.execute(
+                "SELECT MAX(at) FROM (SELECT fetched_at AS at FROM entries WHERE key = ?"
+                " UNION ALL SELECT requested_at FROM refetches WHERE key = ?)",
+                (key, key),
+            ).fetchone()[0]
+            if last is not None and now - last < cooldown:
+                return 0, cooldown - (now - last)
+            conn.execute("INSERT OR REPLACE INTO refetches (key, requested_at) VALUES (?, ?)", (key, now))
+            return conn.execute("DELETE FROM entries WHERE key = ?", (key,)).rowcount, 0.0
+
+    def _claim_refresh(self, key, now):
+        """Take the refresh lease for a key; False if someone else holds it."""
+        with closing(self._connect()) as conn, conn:
+            cursor = conn.execute(
+                "UPDATE entries SET refresh_until = ? WHERE key = ? AND refresh_until < ?",
+                (now + self.refresh_lease, key, now),
+            )
+            return cursor.rowcount == 1
+
+    def _refresh(self, key, fetch):
+        try:
+            self.set(key, fetch())
+        except Exception:
+            # The lease stays in place, so a failing upstream is retried at most once per lease
+            self._count('refresh_error')
+            logger.warning("Background refresh of %s failed", key, exc_info=True)
+
+    def get(self, key, fetch):
+        """Return the cached value for ``key``, calling ``fetch()`` on a miss."""
+        now = time.time()
+        row = self._read(key)
+        if row is not None:
+            value, fetched_at = row
+            age = now - fetched_at
+            if age < self.ttl:
+                self._count('hit')
+                return json.loads(value)
+            if age < self.ttl + self.max_stale:
+                self._count('stale')
+                if self._claim_refresh(key, now):
+                    self._refresher.submit(self._refresh, key, fetch)
+                return json.loads(value)
+
+        self._count('miss')
+        value = fetch()
+        self.set(key, value)
+        return value
@@ -0,0 +1,142 @@
+# ==============================================================================
+# calibration.py - Isotonic calibration of the forests' vote fractions
+# ==============================================================================
+# Calibrate the committed forests (writes calibration.joblib next to them):
+#     python -m melakago.calibration [--model-dir .]
+#
+# The forests are trained on SMOTE-balanced rows, so their vote fractions
+# are not the class frequencies of real hours. Each class gets a monotone
+# mapping from vote fraction to observed frequency, fitted on half of the
+# held-out test split; the other half measures the improvement. At serving
+# time the mapping is a np.interp over the probabilities the label was
+# computed from, so there is no second traversal.
+import argparse
+import json
+import logging
+import os
+
+import numpy as np
+
+from .predict import CALIBRATION_FILE, MODEL_JAM_FILE, MODEL_PEAK_FILE, models_hash
+
+logger = logging.getLogger(__name__)
+
+CALIBRATION_FRACTION = 0.5  # of each target's test split; the rest evaluates it
+
+
+class Calibrator:
+    """Per-class isotonic maps from predicted to calibrated probability.
+
+    Each map is stored as the breakpoints of sklearn's IsotonicRegression
+    and applied with ``np.interp``, which is what its ``predict`` does.
+    For two classes only the second column is mapped and the first is its
+    complement; otherwise the mapped rows are renormalized to sum to 1.
+    """
+
+    def __init__(self, breakpoints):
+        self.breakpoints = breakpoints  # one (x, y) pair of arrays per mapped column
+
+    @classmethod
+    def fit(cls, proba, y, classes):
+        from sklearn.isotonic import IsotonicRegression
+
+        columns = [1] if len(classes) == 2 else range(len(classes))
+        breakpoints = []
+        for column in columns:
+            isotonic = IsotonicRegression(y_min=0.0, y_max=1.0, out_of_bounds='clip')
+            isotonic.fit(proba[:, column], (y == classes[column]).astype(np.float64))
+            breakpoints.append((isotonic.X_thresholds_, isotonic.y_thresholds_))
+        return cls(breakpoints)
+
+    def transform(self, proba):
+        if len(self.breakpoints) == 1:
+            x, y = self.breakpoints[0]
+            positive = np.interp(proba[:, 1], x, y)
+            return np.column_stack([1.0 - positive, positive])
+        calibrated = np.column_stack([np.interp(proba[:, column], x, y)
+                                      for column, (x, y) in enumerate(self.breakpoints)])
+        total = calibrated.sum(axis=1, keepdims=True)
+        # A row every map sends to 0 keeps its uncalibrated probabilities
+        return np.where(total > 0, calibrated / np.where(total > 0, total, 1.0), proba)
+
+
+def brier_score(proba, y, classes):
+    """Mean squared error between the probability rows and the one-hot labels."""
+    one_hot = (np.asarray(y)[:, None] == np.asarray(classes)[None, :]).astype(np.float64)
+    return float(np.mean(np.sum((proba - one_hot) ** 2, axis=1)))
+
+
+def expected_calibration_error(proba, y, classes, bins=10):
+    """Gap between confidence and accuracy of the top class, averaged over confidence bins."""
+    confidence = proba.max(axis=1)
+    correct = np.asarray(classes).take(proba.argmax(axis=1)) == np.asarray(y)
+    index = np.minimum((confidence * bins).astype(int), bins - 1)
+    error = 0.0
+    for b in range(bins):
+        in_bin = index == b
+        if in_bin.any():
+            error += in_bin.mean() * abs(correct[in_bin].mean() - confidence[in_bin].mean())
+    return float(error)
+
+
+def fit_calibration(models, prepared, random_state=42):
+    """Calibrators for ``{'jam': model, 'peak': model}`` and a before/after report.
+
+    ``prepared`` is the training prep of train.py; each model must not have
+    seen its target's test split.
+    """
+    from sklearn.model_selection import train_test_split
+
+    calibrators, report = {}, {}
+    for target, model in models.items():
+        sets = prepared['targets'][target]
+        X_fit, X_eval, y_fit, y_eval = train_test_split(
+            sets['X_test'], sets['y_test'], train_size=CALIBRATION_FRACTION,
+            random_state=random_state, stratify=sets['y_test'])
+        classes = model.classes_
+        calibrators[target] = Calibrator.fit(model.predict_proba(X_fit), y_fit, classes)
+        raw = model.predict_proba(X_eval)
+        calibrated = calibrators[target].transform(raw)
+        report[target] = {
+            'rows': {'fit': len(y_fit), 'eval': len(y_eval)},
+            'brier': {'raw': brier_score(raw, y_eval, classes), 'calibrated': brier_score(calibrated, y_eval, classes)},
+            'ece': {'raw': expected_calibration_error(raw, y_eval, classes),
+                    'calibrated': expected_calibration_error(calibrated, y_eval, classes)},
+        }
+    return calibrators, report
+
+
+def write_calibration(models, prepared, out_dir):
+    """Fit and write CALIBRATION_FILE for the models in ``out_dir``; returns the report.
+
+    The models and preprocessor must already be written there: their
+    ``models_hash`` is stored with the calibrators, and Predictor.load only
+    applies them to the same artifacts.
+    """
+    import joblib
+
+    calibrators, report = fit_calibration(models, prepared)
+    joblib.dump({'models_hash': models_hash(out_dir), **calibrators}, os.path.join(out_dir, CALIBRATION_FILE))
+    return report
+
+
+if __name__ == "__main__":
+    from .train import DEFAULT_CACHE_DIR, SOURCE_CSV, load_or_prepare
+
+    parser = argparse.ArgumentParser(description="Calibrate the jam and peak models on their held-out split")
+    parser.add_argument('--model-dir', default='.')
+    parser.add_argument('--source', default=SOURCE_CSV)
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    import joblib
+
+    prepared = joblib.load(load_or_prepare(args.source, args.cache_dir)[0])
+    models = {'jam': joblib.load(os.path.join(args.model_dir, MODEL_JAM_FILE)),
+              'peak': joblib.load(os.path.join(args.model_dir, MODEL_PEAK_FILE))}
+    # Through the package module, so the pickled Calibrator is melakago.calibration's, not __main__'s
+    from . import calibration
+
+    report = calibration.write_calibration(models, prepared, args.model_dir)
+    print(json.dumps(report, indent=2))
@@ -0,0 +1,177 @@
+# ==============================================================================
+# dashboard.py - Incremental rebuild of dashboard_data.csv from the raw counts
+# ==============================================================================
+# Run from the project root (needs the three .joblib artifacts):
+#     python -m melakago.dashboard [--full]
+#
+# Only hours past the watermark stored next to the output are scored and
+# appended. Everything is rescored when the model artifacts change.
+import argparse
+import hashlib
+import json
+import logging
+import os
+import time
+
+from .data import HISTORY_CSV
+from .labels import daily_peak_category
+from .predict import Predictor, models_hash
+
+logger = logging.getLogger(__name__)
+
+SOURCE_CSV = 'traffic_with_weather_modified.csv'
+SOURCE_CHUNKSIZE = 50_000
+DATETIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+WATERMARK_VERSION = 1  # bump when the output columns or labelling change
+
+# Column order of the export in section 7 of 03_FinalModellingPhase.ipynb
+DASHBOARD_COLUMNS = [
+    'datetime', 'hour', 'day_of_week', 'month', 'is_weekend', 'is_holiday_mlk',
+    'temperature_2m', 'relative_humidity_2m', 'weathercode', 'windspeed_10m',
+    'total_traffic', 'total_car', 'total_motorcycle',
+    'predicted_jam_label', 'predicted_peak_category',
+    'is_jam', 'peak_category_daily',
+]
+SOURCE_COLUMNS = [c for c in DASHBOARD_COLUMNS
+                  if c not in ('predicted_jam_label', 'predicted_peak_category', 'peak_category_daily')]
+
+
+def watermark_path_for(output_path):
+    return os.path.splitext(output_path)[0] + '.watermark.json'
+
+
+def watermark_hash(model_dir='.'):
+    """SHA-256 over the watermark version and the model artifacts' ``models_hash``."""
+    return hashlib.sha256(f"{WATERMARK_VERSION}:{models_hash(model_dir)}".encode()).hexdigest()
+
+
+def score_days(predictor, rows):
+    """Dashboard rows for whole days of source rows."""
+    rows = rows.assign(peak_category_daily=daily_peak_category(rows))
+    result = predictor.predict(predictor.featurize_rows(rows))
+    rows['predicted_jam_label'] = ['Jam Likely' if jam else 'No Jam' for jam in result['is_jam']]
+    rows['predicted_peak_category'] = result['peak_category']
+    return rows[DASHBOARD_COLUMNS]
+
+
+def iter_days(source_path, since=None, chunksize=SOURCE_CHUNKSIZE):
+    """Yield source rows in blocks of whole days, starting at the day of ``since``.
+
+    The source is read in chunks; the last (possibly incomplete) day of a
+    chunk is held back and joined to the next one. Rows must be sorted by
+    datetime, as the source CSV is.
+    """
+    import pandas as pd
+
+    carry = None
+    for chunk in pd.read_csv(source_path, usecols=SOURCE_COLUMNS, parse_dates=['datetime'],
+                             chunksize=chunksize):
+        if since is not None:
+            chunk = chunk[chunk['datetime'] >= since.normalize()]
+        if carry is not None:
+            chunk = pd.concat([carry, chunk], ignore_index=True)
+        if chunk.empty:
+            continue
+        if not chunk['datetime'].is_monotonic_increasing:
+            raise ValueError(f"{source_path} is not sorted by datetime.")
+        last_day = chunk['datetime'].iloc[-1].normalize()
+        complete = chunk['datetime'] < last_day
+        carry = chunk[~complete]
+        if complete.any():
+            yield chunk[complete]
+    if carry is not None and not carry.empty:
+        yield carry
+
+
+def _read_watermark(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_watermark(path, watermark):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(watermark, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def _write_days(f, days, watermark):
+    """Write scored days to ``f`` (binary), tracking where the last day starts."""
+    for day_rows in days:
+        last_date = day_rows['datetime'].iloc[-1].normalize()
+        for date, rows in day_rows.groupby(day_rows['datetime'].dt.normalize(), sort=False):
+            if date == last_date:
+                watermark['last_day_offset'] = f.tell()
+                watermark['last_day_rows'] = len(rows)
+            f.write(rows.to_csv(header=False, index=False, date_format=DATETIME_FORMAT).encode())
+        watermark['last_datetime'] = day_rows['datetime'].iloc[-1].isoformat()
+        watermark['rows'] += len(day_rows)
+
+
+def build_dashboard_data(source_path=SOURCE_CSV, output_path=HISTORY_CSV, model_dir='.', full=False):
+    """Bring ``output_path`` up to date with ``source_path``; returns the number of rows scored.
+
+    With a valid watermark for the current model artifacts, only the days
+    from the watermark's last day onwards are scored: the last day is
+    rewritten in place (its daily peak labels depend on all of its hours)
+    and later days are appended. Otherwise, or with ``full=True``, the
+    whole output is rebuilt and atomically replaced.
+    """
+    import pandas as pd
+
+    watermark_path = watermark_path_for(output_path)
+    current_hash = watermark_hash(model_dir)
+    watermark = None if full else _read_watermark(watermark_path)
+    if watermark is not None and (
+        watermark.get('models_hash') != current_hash
+        or not watermark.get('last_datetime')
+        or not os.path.exists(output_path)
+        or os.path.getsize(output_path) < watermark.get('last_day_offset', 0)
+    ):
+        logger.info("Watermark does not match %s; rebuilding it in full", output_path)
+        watermark = None
+
+    predictor = Predictor.load(model_dir, history_csv=None, compiled=False)
+
+    if watermark is None:
+        watermark = {'models_hash': current_hash, 'last_datetime': None,
+                     'last_day_offset': 0, 'last_day_rows': 0, 'rows': 0}
+        tmp_path = f"{output_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write((','.join(DASHBOARD_COLUMNS) + '\n').encode())
+            _write_days(f, (score_days(predictor, days) for days in iter_days(source_path)), watermark)
+        os.replace(tmp_path, output_path)
+        _write_watermark(watermark_path, watermark)
+        return watermark['rows']
+
+    last_datetime = pd.Timestamp(watermark['last_datetime'])
+    new_days = list(iter_days(source_path, since=last_datetime))
+    if not new_days or new_days[-1]['datetime'].iloc[-1] <= last_datetime:
+        return 0
+
+    # The watermark's day is rescored whole, so its rows are dropped from the output first
+    watermark['rows'] -= watermark['last_day_rows']
+    kept_rows = watermark['rows']
+    with open(output_path, 'r+b') as f:
+        f.truncate(watermark['last_day_offset'])
+        f.seek(watermark['last_day_offset'])
+        _write_days(f, (score_days(predictor, days) for days in new_days), watermark)
+    _write_watermark(watermark_path, watermark)
+    return watermark['rows'] - kept_rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild dashboard_data.csv from the raw counts, incrementally")
+    parser.add_argument('--source', default=SOURCE_CSV)
+    parser.add_argument('--output', default=HISTORY_CSV)
+    parser.add_argument('--model-dir', default='.')
+    parser.add_argument('--full', action='store_true', help="ignore the watermark and rescore everything")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    start = time.perf_counter()
+    n_rows = build_dashboard_data(args.source, args.output, args.model_dir, args.full)
+    logger.info("Scored %d rows in %.1fs -> %s", n_rows, time.perf_counter() - start, args.output)
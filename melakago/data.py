@@ -0,0 +1,77 @@
+# ==============================================================================
+# data.py - Typed loading of dashboard_data.csv with a columnar binary cache
+# ==============================================================================
+# Build (or rebuild) the cache explicitly with:
+#     python -m melakago.data [dashboard_data.csv]
+import os
+import sys
+
+HISTORY_CSV = 'dashboard_data.csv'
+CATEGORICAL_COLUMNS = [
+    'day_of_week',
+    'month',
+    'predicted_jam_label',
+    'predicted_peak_category',
+    'peak_category_daily',
+]
+
+
+def cache_path_for(csv_path):
+    """Location of the Feather cache that sits next to a CSV file."""
+    return os.path.splitext(csv_path)[0] + '.feather'
+
+
+def read_history_csv(csv_path=HISTORY_CSV):
+    """Parse the history CSV into categorical and datetime64 dtypes."""
+    import pandas as pd
+
+    df = pd.read_csv(csv_path, parse_dates=['datetime'])
+    for column in CATEGORICAL_COLUMNS:
+        if column in df.columns:
+            df[column] = df[column].astype('category')
+    return df
+
+
+def build_history_cache(csv_path=HISTORY_CSV, cache_path=None, df=None):
+    """Write the typed history to an uncompressed (memory-mappable) Feather file."""
+    import pyarrow.feather as feather
+
+    cache_path = cache_path or cache_path_for(csv_path)
+    if df is None:
+        df = read_history_csv(csv_path)
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    feather.write_feather(df, tmp_path, compression='uncompressed')
+    os.replace(tmp_path, cache_path)
+    return cache_path
+
+
+def load_history(csv_path=HISTORY_CSV, cache_path=None):
+    """Load the history, preferring the Feather cache when it is newer than the CSV.
+
+    On a cache miss the CSV is parsed and the cache is written for the next
+    process start. Without pyarrow, or on a read-only filesystem, this falls
+    back to the CSV alone.
+    """
+    cache_path = cache_path or cache_path_for(csv_path)
+    try:
+        import pyarrow.feather as feather
+    except ImportError:
+        return read_history_csv(csv_path)
+
+    try:
+        if os.path.getmtime(cache_path) >= os.path.getmtime(csv_path):
+            return feather.read_table(cache_path, memory_map=True).to_pandas()
+    except (OSError, ValueError):
+        pass
+
+    df = read_history_csv(csv_path)
+    try:
+        build_history_cache(csv_path, cache_path, df=df)
+    except OSError:
+        pass
+    return df
+
+
+if __name__ == "__main__":
+    source = sys.argv[1] if len(sys.argv) > 1 else HISTORY_CSV
+    print(f"Wrote {build_history_cache(source)}")
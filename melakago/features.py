@@ -0,0 +1,98 @@
+# ==============================================================================
+# features.py - NumPy featurizer built from the fitted preprocessor.joblib
+# ==============================================================================
+import numpy as np
+
+MONTH_MAP = {'January':1, 'February':2, 'March':3, 'April':4, 'May':5, 'June':6,
+             'July':7, 'August':8, 'September':9, 'October':10, 'November':11, 'December':12}
+
+
+class Featurizer:
+    """Replays the fitted ColumnTransformer with plain NumPy.
+
+    The category lists, means and scales are read from ``preprocessor`` once.
+    ``transform`` then writes the dense feature matrix straight into a
+    preallocated float32 array, in the column order the models were
+    trained on. Values equal ``preprocessor.transform`` cast to float32,
+    which is what the forests compare against.
+    """
+
+    def __init__(self, preprocessor):
+        self.feature_names_in_ = list(preprocessor.feature_names_in_)
+        self.numeric = []      # (output column, input name, mean, scale)
+        self.categorical = []  # (first output column, input name, categories)
+        self.passthrough = []  # (output column, input name)
+
+        for name, transformer, columns in preprocessor.transformers_:
+            output = preprocessor.output_indices_[name]
+            if transformer == 'drop' or output.start == output.stop:
+                continue
+            column = output.start
+            columns = [self.feature_names_in_[c] if isinstance(c, (int, np.integer)) else c
+                       for c in columns]
+            # A fitted 'passthrough' remainder is stored as an identity FunctionTransformer
+            if transformer == 'passthrough' or getattr(transformer, 'func', False) is None:
+                for input_name in columns:
+                    self.passthrough.append((column, input_name))
+                    column += 1
+            elif hasattr(transformer, 'categories_'):
+                if transformer.drop is not None or transformer.handle_unknown != 'ignore':
+                    raise ValueError(f"Unsupported OneHotEncoder settings in '{name}'.")
+                for input_name, categories in zip(columns, transformer.categories_):
+                    categories = np.asarray(categories)
+                    if np.any(categories[:-1] > categories[1:]):
+                        raise ValueError(f"Categories of '{input_name}' must be sorted.")
+                    self.categorical.append((column, input_name, categories))
+                    column += len(categories)
+            elif hasattr(transformer, 'mean_'):
+                mean = transformer.mean_ if transformer.with_mean else np.zeros(len(columns))
+                scale = transformer.scale_ if transformer.with_std else np.ones(len(columns))
+                for input_name, m, s in zip(columns, mean, scale):
+                    self.numeric.append((column, input_name, float(m), float(s)))
+                    column += 1
+            else:
+                raise ValueError(f"Unsupported transformer '{name}': {transformer!r}")
+        self.n_features_out_ = max(output.stop for output in preprocessor.output_indices_.values())
+
+    def transform(self, hour, day_of_week, month, is_weekend, is_holiday_mlk,
+                  temperature_2m, relative_humidity_2m, weathercode, windspeed_10m, out=None):
+        """Build the model feature matrix from raw inputs.
+
+        Each argument is a scalar or a 1-D array; scalars are broadcast over
+        the rows. ``month`` is the month number (1-12) and ``day_of_week``
+        the English day name. Pass ``out`` to reuse a float32 buffer.
+        """
+        raw = {
+            'temperature_2m': temperature_2m,
+            'relative_humidity_2m': relative_humidity_2m,
+            'weathercode': weathercode,
+            'windspeed_10m': windspeed_10m,
+            'is_weekend': is_weekend,
+            'is_holiday_mlk': is_holiday_mlk,
+            'day_of_week': day_of_week,
+        }
+        hour = np.asarray(hour)
+        month = np.asarray(month)
+        raw['hour_sin'] = np.sin(2 * np.pi * hour / 24)
+        raw['hour_cos'] = np.cos(2 * np.pi * hour / 24)
+        raw['month_sin'] = np.sin(2 * np.pi * month / 12)
+        raw['month_cos'] = np.cos(2 * np.pi * month / 12)
+
+        n_rows = max([np.size(value) for value in raw.values() if np.ndim(value) > 0], default=1)
+        if out is None:
+            out = np.zeros((n_rows, self.n_features_out_), dtype=np.float32)
+        else:
+            out[:n_rows].fill(0)
+            out = out[:n_rows]
+
+        for column, input_name, mean, scale in self.numeric:
+            out[:, column] = (np.asarray(raw[input_name], dtype=np.float64) - mean) / scale
+        for column, input_name in self.passthrough:
+            out[:, column] = np.asarray(raw[input_name], dtype=np.float64)
+        for column, input_name, categories in self.categorical:
+            values = np.broadcast_to(np.asarray(raw[input_name]), (n_rows,))
+            index = np.searchsorted(categories, values)
+            found = index < len(categories)
+            found[found] = categories[index[found]] == values[found]
+            out[np.flatnonzero(found), column + index[found]] = 1.0
+        return out
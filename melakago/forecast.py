@@ -0,0 +1,90 @@
+# ==============================================================================
+# forecast.py - Cached, batched forecast lookups shared by the dashboard and API
+# ==============================================================================
+from datetime import date, timedelta
+
+from .weather import FORECAST_HORIZON_DAYS, parse_hourly, slice_date
+
+MELAKA_LOCATIONS = {
+    "Ayer Keroh": (2.2760, 102.2921),
+    "Bandar Hilir": (2.1935, 102.2496),
+    "Bukit Katil": (2.2234, 102.2915),
+    "Alor Gajah": (2.3817, 102.2089),
+    "Jasin": (2.3084, 102.4381),
+    "Melaka Tengah": (2.2008, 102.2487),
+}
+
+
+def forecast_cache_key(lat: float, lon: float, start_date: str, end_date: str):
+    return f"forecast:{lat:.4f},{lon:.4f}:{start_date}:{end_date}"
+
+
+def forecast_range_for(target_date: str):
+    """The (start, end) range fetched for a date: the whole horizon, or just that day beyond it."""
+    selected_date = date.fromisoformat(target_date)
+    horizon_start = date.today()
+    horizon_end = horizon_start + timedelta(days=FORECAST_HORIZON_DAYS - 1)
+    if horizon_start <= selected_date <= horizon_end:
+        return horizon_start.isoformat(), horizon_end.isoformat()
+    return target_date, target_date
+
+
+class ForecastService:
+    """Forecast lookups through a ``SharedCache`` in front of a ``WeatherClient``.
+
+    Dates inside the forecast horizon are served from one cached horizon
+    response per location. A miss (or stale refresh) for any configured
+    location fetches all of ``locations`` in one request and prewarms the
+    cache with each, so switching location stays local.
+    """
+
+    def __init__(self, client, cache, locations=MELAKA_LOCATIONS):
+        self.client = client
+        self.cache = cache
+        self.locations = dict(locations)
+
+    def fetch_all_locations(self, start_date: str, end_date: str):
+        """Fetch every configured location in one request and store each in the cache."""
+        points = list(self.locations.values())
+        responses = self.client.fetch_forecast_json_many(points, start_date, end_date)
+        for (lat, lon), data in zip(points, responses):
+            self.cache.set(forecast_cache_key(lat, lon, start_date, end_date), data)
+        return dict(zip(points, responses))
+
+    def get_range(self, lat: float, lon: float, start_date: str, end_date: str):
+        """Hourly weather for a date range, served stale-while-revalidate from the cache."""
+        if (lat, lon) in self.locations.values():
+            fetch = lambda: self.fetch_all_locations(start_date, end_date)[(lat, lon)]
+        else:
+            fetch = lambda: self.client.fetch_forecast_json(lat, lon, start_date, end_date)
+        data = self.cache.get(forecast_cache_key(lat, lon, start_date, end_date), fetch)
+        return parse_hourly(data)
+
+    def for_date(self, lat: float, lon: float, target_date: str):
+        """Hourly forecast rows for one date.
+
+        Raises ``requests.exceptions.RequestException`` if it has to be
+        fetched and the request fails.
+        """
+        start_date, end_date = forecast_range_for(target_date)
+        forecast_df = self.get_range(lat, lon, start_date, end_date)
+        if start_date != end_date:
+            return slice_date(forecast_df, date.fromisoformat(target_date))
+        return forecast_df
+
+    def fetched_at(self, lat: float, lon: float, target_date: str):
+        """When the forecast a date is served from was fetched, or None if it is not cached.
+
+        Changes whenever that response is refetched, so it can key caches of
+        anything derived from it.
+        """
+        return self.cache.fetched_at(forecast_cache_key(lat, lon, *forecast_range_for(target_date)))
+
+    def evict(self, lat: float, lon: float, target_date: str, cooldown=0):
+        """Evict the cached forecast a date is served from, at most once per ``cooldown``.
+
+        The cooldown counts from the last fetch or eviction request, whether
+        or not that fetch succeeded. Returns the number of entries evicted
+        and the seconds left on the cooldown (0 if the next lookup may fetch).
+        """
+        return self.cache.request_refetch(forecast_cache_key(lat, lon, *forecast_range_for(target_date)), cooldown)
@@ -0,0 +1,259 @@
+# ==============================================================================
+# forest.py - Array-based inference for the fitted RandomForestClassifiers
+# ==============================================================================
+# Build (or rebuild) the memory-mappable dumps of the forests explicitly with:
+#     python -m melakago.forest [model_dir]
+import contextlib
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: rebuilds are not serialized, but each one is still replaced in atomically
+    fcntl = None
+
+COMPILED_FORMAT_VERSION = 3  # bump whenever CompiledForest's attributes, their layout or their values change
+
+
+class CompiledForest:
+    """Flat NumPy copy of a fitted RandomForestClassifier for low-latency inference.
+
+    Every tree is packed into one set of contiguous node arrays (feature,
+    threshold, children, leaf class fractions). Leaves point at themselves,
+    so a traversal step is the same for every (row, tree) pair and whole
+    batches advance together. Pairs that reach a leaf are dropped from the
+    working set, so the cost follows the actual path lengths.
+
+    ``predict`` and ``predict_proba`` match sklearn exactly: rows are cast
+    to float32 as sklearn does, and the per-tree probabilities are summed
+    in estimator order.
+    """
+
+    def __init__(self, forest):
+        if getattr(forest, "n_outputs_", 1) != 1:
+            raise ValueError("CompiledForest only supports single-output forests.")
+        trees = [estimator.tree_ for estimator in forest.estimators_]
+        node_counts = np.array([tree.node_count for tree in trees])
+        offsets = np.concatenate([[0], np.cumsum(node_counts)[:-1]])
+        total_nodes = int(node_counts.sum())
+
+        self.classes_ = forest.classes_
+        self.n_classes_ = len(forest.classes_)
+        self.n_features_in_ = forest.n_features_in_
+        self.n_estimators = len(trees)
+        self.roots = offsets.astype(np.intp)
+
+        self.feature = np.zeros(total_nodes, dtype=np.intp)
+        self.threshold = np.zeros(total_nodes, dtype=np.float64)
+        self.children = np.zeros(2 * total_nodes, dtype=np.intp)
+        self.missing_go_to_left = np.zeros(total_nodes, dtype=bool)
+        self.value = np.zeros((total_nodes, self.n_classes_), dtype=np.float64)
+
+        for tree, offset in zip(trees, offsets):
+            nodes = slice(offset, offset + tree.node_count)
+            node_ids = np.arange(tree.node_count) + offset
+            is_leaf = tree.children_left == -1
+
+            self.feature[nodes] = np.where(is_leaf, 0, tree.feature)
+            self.threshold[nodes] = np.where(is_leaf, np.inf, tree.threshold)
+            self.children[2 * offset:2 * (offset + tree.node_count):2] = np.where(
+                is_leaf, node_ids, tree.children_left + offset)
+            self.children[2 * offset + 1:2 * (offset + tree.node_count):2] = np.where(
+                is_leaf, node_ids, tree.children_right + offset)
+            self.missing_go_to_left[nodes] = tree.missing_go_to_left.astype(bool)
+
+            # tree_.value holds class fractions, which DecisionTreeClassifier.predict_proba returns
+            # as they are; renormalizing them would move multi-class rows by an ulp
+            self.value[nodes] = tree.value[:, 0, :self.n_classes_]
+
+        self.is_leaf = self.children[0::2] == np.arange(total_nodes)
+
+    def __setstate__(self, state):
+        # joblib's mmap_mode gives np.memmap arrays; plain ndarray views of the
+        # same pages skip memmap's overhead on every step of the traversal
+        self.__dict__.update({name: np.asarray(value) if isinstance(value, np.ndarray) else value
+                              for name, value in state.items()})
+
+    def _validate(self, X):
+        if hasattr(X, "toarray"):
+            X = X.toarray()
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != self.n_features_in_:
+            raise ValueError(
+                f"X has {X.shape[-1]} features, but CompiledForest is expecting "
+                f"{self.n_features_in_} features as input."
+            )
+        return X
+
+    def apply(self, X):
+        """Return the global leaf index reached in every tree, shape (n_samples, n_estimators)."""
+        X = self._validate(X)
+        n_samples, n_features = X.shape
+        X_flat = X.ravel()
+        has_nan = bool(np.isnan(X_flat).any())
+
+        node = np.tile(self.roots, n_samples)
+        row_base = np.repeat(np.arange(n_samples) * n_features, self.n_estimators)
+        position = np.arange(n_samples * self.n_estimators)
+        leaves = np.empty(n_samples * self.n_estimators, dtype=np.intp)
+
+        while position.size:
+            x = X_flat[row_base + self.feature[node]]
+            go_right = x > self.threshold[node]
+            if has_nan:
+                is_nan = np.isnan(x)
+                go_right |= is_nan & ~self.missing_go_to_left[node]
+            node = self.children[2 * node + go_right]
+            done = self.is_leaf[node]
+            if done.any():
+                leaves[position[done]] = node[done]
+                active = ~done
+                node, row_base, position = node[active], row_base[active], position[active]
+
+        return leaves.reshape(n_samples, self.n_estimators)
+
+    def predict_proba(self, X):
+        """Class probabilities averaged over trees, identical to sklearn's."""
+        leaves = self.apply(X)
+        # cumsum accumulates strictly in tree order, like RandomForestClassifier
+        proba = self.value[leaves].cumsum(axis=1)[:, -1]
+        proba /= self.n_estimators
+        return proba
+
+    def predict(self, X):
+        """Predicted class labels, identical to sklearn's."""
+        proba = self.predict_proba(X)
+        return self.classes_.take(np.argmax(proba, axis=1), axis=0)
+
+
+def compiled_path_for(model_path):
+    """Location of the CompiledForest dump that sits next to a model .joblib file."""
+    return os.path.splitext(model_path)[0] + '.compiled.joblib'
+
+
+def _source_stamp(model_path):
+    """Size and modification time of the model a dump was compiled from."""
+    stat = os.stat(model_path)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def _compilable(model):
+    """Whether ``model`` is served compiled: a fitted forest, or a JointModel around one."""
+    return hasattr(model, 'estimators_') or hasattr(model, 'compiled')
+
+
+def _serving_form(model):
+    """A CompiledForest for a forest, ``model.compiled()`` for a JointModel."""
+    return CompiledForest(model) if hasattr(model, 'estimators_') else model.compiled()
+
+
+def build_compiled(model_path, cache_path=None, model=None):
+    """Compile the forest in ``model_path`` and dump it uncompressed, so it can be memory-mapped.
+
+    A JointModel (see joint.py) is dumped with its forest compiled. The
+    dump records COMPILED_FORMAT_VERSION and the model file's size and
+    mtime next to the compiled model, so ``load_compiled`` can tell when it
+    is out of date. It is written to a temporary file and renamed into
+    place, so a concurrent reader sees the old dump or the new one, never
+    a partial file.
+    """
+    import joblib
+
+    cache_path = cache_path or compiled_path_for(model_path)
+    source = _source_stamp(model_path)  # before loading, so a model replaced meanwhile looks stale
+    if model is None:
+        model = joblib.load(model_path)
+    if not _compilable(model):
+        raise ValueError(f"{model_path} holds neither a forest nor a JointModel.")
+    fd, tmp_path = tempfile.mkstemp(prefix=os.path.basename(cache_path) + '.', suffix='.tmp',
+                                    dir=os.path.dirname(os.path.abspath(cache_path)))
+    os.close(fd)
+    try:
+        joblib.dump({'format_version': COMPILED_FORMAT_VERSION, 'source': source, 'model': _serving_form(model)},
+                    tmp_path)
+        os.replace(tmp_path, cache_path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(tmp_path)
+        raise
+    return cache_path
+
+
+@contextlib.contextmanager
+def _rebuild_lock(cache_path):
+    """Exclusive lock on ``<cache_path>.lock``, so concurrent loaders rebuild a dump once."""
+    with open(cache_path + '.lock', 'a') as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)  # released when the file is closed
+        yield
+
+
+def _load_current(model_path, cache_path):
+    """The memory-mapped model in ``cache_path`` if it is current for ``model_path``, else None."""
+    import joblib
+
+    try:
+        dump = joblib.load(cache_path, mmap_mode='r')
+        if (isinstance(dump, dict) and dump.get('format_version') == COMPILED_FORMAT_VERSION
+                and dump.get('source') == _source_stamp(model_path)):
+            return dump['model']
+    except Exception:
+        pass  # missing, truncated or written by older code
+    return None
+
+
+def load_compiled(model_path, cache_path=None):
+    """Load a model for serving: a forest or JointModel memory-mapped from its compiled dump, anything else as is.
+
+    The node arrays are read with ``mmap_mode='r'`` from the dump next to
+    the model, so every process on the host shares one copy of them in the
+    page cache instead of unpickling its own. The dump is (re)built when it
+    is missing, unreadable, of another COMPILED_FORMAT_VERSION, or was
+    compiled from a model file of another size or mtime. Rebuilds hold a
+    lock file next to the dump: workers starting together against a stale
+    dump wait for the first one's rebuild and map its result. On a
+    read-only filesystem the model is compiled in memory instead.
+    """
+    import joblib
+
+    cache_path = cache_path or compiled_path_for(model_path)
+    compiled = _load_current(model_path, cache_path)
+    if compiled is not None:
+        return compiled
+
+    model = None
+    try:
+        with _rebuild_lock(cache_path):
+            compiled = _load_current(model_path, cache_path)  # rebuilt while this process waited
+            if compiled is not None:
+                return compiled
+            model = joblib.load(model_path)
+            if not _compilable(model):
+                return model
+            build_compiled(model_path, cache_path, model=model)
+    except OSError:
+        if model is None:
+            model = joblib.load(model_path)
+        return _serving_form(model) if _compilable(model) else model
+    return joblib.load(cache_path, mmap_mode='r')['model']
+
+
+def ensure_compiled(model_dir='.'):
+    """Build every missing or stale dump in ``model_dir``, e.g. once before forking workers."""
+    from .predict import MODEL_JAM_FILE, MODEL_JOINT_FILE, MODEL_PEAK_FILE
+
+    for name in (MODEL_JAM_FILE, MODEL_PEAK_FILE, MODEL_JOINT_FILE):
+        if os.path.exists(os.path.join(model_dir, name)):
+            load_compiled(os.path.join(model_dir, name))
+
+
+if __name__ == "__main__":
+    from .predict import MODEL_JAM_FILE, MODEL_JOINT_FILE, MODEL_PEAK_FILE
+
+    model_dir = sys.argv[1] if len(sys.argv) > 1 else '.'
+    for name in (MODEL_JAM_FILE, MODEL_PEAK_FILE, MODEL_JOINT_FILE):
+        if name != MODEL_JOINT_FILE or os.path.exists(os.path.join(model_dir, name)):
+            print(f"Wrote {build_compiled(os.path.join(model_dir, name))}")
@@ -0,0 +1,51 @@
+# ==============================================================================
+# history.py - (date, hour) lookups over the historical dashboard data
+# ==============================================================================
+import numpy as np
+
+
+class HistoryIndex:
+    """Hash index over ``df_historical`` built once at load time.
+
+    Maps every (date, hour) to the row position of its first record and
+    every date to its holiday flag. Looking up a day costs 24 dictionary
+    probes, however many years or sensors the history holds.
+    """
+
+    def __init__(self, df_historical):
+        self.df = df_historical
+        dates = df_historical['datetime'].dt.date.tolist()
+        hours = df_historical['datetime'].dt.hour.tolist()
+        positions = list(range(len(df_historical)))
+
+        # Iterate in reverse so the first record of a duplicated key wins
+        self.positions = dict(zip(zip(dates[::-1], hours[::-1]), positions[::-1]))
+
+        # Most recent record for every hour of the day, used as a fallback
+        self.latest_by_hour = dict(zip(hours, positions))
+        self.hours = sorted(self.latest_by_hour)
+
+        if 'is_holiday_mlk' in df_historical.columns:
+            flags = df_historical['is_holiday_mlk'].tolist()
+            self.holidays = {d: flags[p] for d, p in zip(dates[::-1], positions[::-1])}
+        else:
+            self.holidays = {}
+
+    def is_holiday(self, selected_date):
+        """Return the Malacca holiday flag recorded for a date (False if unknown)."""
+        try:
+            return bool(self.holidays.get(selected_date, False))
+        except (TypeError, ValueError):
+            return False
+
+    def hourly_pattern(self):
+        """Most recent historical row for each hour of the day, indexed by hour."""
+        rows = self.df.iloc[[self.latest_by_hour[hour] for hour in self.hours]]
+        return rows.set_index(np.array(self.hours)).rename_axis('hour')
+
+    def day_weather(self, selected_date):
+        """Hourly rows for a date, falling back to the latest similar hour."""
+        positions = [self.positions.get((selected_date, hour), self.latest_by_hour[hour])
+                     for hour in self.hours]
+        rows = self.df.iloc[positions]
+        return rows.set_index(np.array(self.hours)).rename_axis('hour')
@@ -0,0 +1,73 @@
+# ==============================================================================
+# joint.py - One forest for both targets: (is_jam, peak_category) pairs as classes
+# ==============================================================================
+import numpy as np
+
+
+def joint_codes(is_jam, peak_category, jam_classes, peak_classes):
+    """Integer code of each (jam, peak) pair: jam index * len(peak_classes) + peak index."""
+    jam_index = np.searchsorted(jam_classes, is_jam)
+    peak_index = np.searchsorted(peak_classes, peak_category)
+    return jam_index * len(peak_classes) + peak_index
+
+
+class _Marginal:
+    """One target's view of a JointModel, usable where a single classifier is expected."""
+
+    def __init__(self, joint, index):
+        self.joint = joint
+        self.index = index
+        self.classes_ = (joint.jam_classes_, joint.peak_classes_)[index]
+
+    def predict_proba(self, X):
+        return self.joint.predict_proba(X)[self.index]
+
+    def predict(self, X):
+        return self.classes_.take(np.argmax(self.predict_proba(X), axis=1))
+
+
+class JointModel:
+    """A single classifier over jam / peak pairs, so one traversal yields both labels.
+
+    The wrapped classifier (a forest, or its CompiledForest) predicts the
+    joint code from ``joint_codes``. Summing its class probabilities over
+    the other target gives each target's probabilities, so
+    ``predict_proba`` returns (jam proba, peak proba) in the column order
+    of ``jam_classes_`` and ``peak_classes_``. ``jam`` and ``peak`` are
+    views with the single-model interface.
+    """
+
+    def __init__(self, model, jam_classes, peak_classes):
+        self.model = model
+        self.jam_classes_ = np.asarray(jam_classes)
+        self.peak_classes_ = np.asarray(peak_classes)
+        # Pairs never seen in training are not among model.classes_ and get no column
+        codes = np.asarray(model.classes_)
+        n_peak = len(self.peak_classes_)
+        self.jam_matrix = (codes[:, None] // n_peak == np.arange(len(self.jam_classes_))).astype(np.float64)
+        self.peak_matrix = (codes[:, None] % n_peak == np.arange(n_peak)).astype(np.float64)
+        self.jam = _Marginal(self, 0)
+        self.peak = _Marginal(self, 1)
+
+    def __getstate__(self):
+        return {'model': self.model, 'jam_classes': self.jam_classes_, 'peak_classes': self.peak_classes_}
+
+    def __setstate__(self, state):
+        self.__init__(state['model'], state['jam_classes'], state['peak_classes'])
+
+    @classmethod
+    def fit(cls, model, X, is_jam, peak_category):
+        """Fit ``model`` on the joint codes of the two label arrays."""
+        jam_classes, peak_classes = np.unique(is_jam), np.unique(peak_category)
+        model.fit(X, joint_codes(is_jam, peak_category, jam_classes, peak_classes))
+        return cls(model, jam_classes, peak_classes)
+
+    def compiled(self):
+        """The same model with its forest flattened into a CompiledForest."""
+        from .forest import CompiledForest
+
+        return JointModel(CompiledForest(self.model), self.jam_classes_, self.peak_classes_)
+
+    def predict_proba(self, X):
+        proba = self.model.predict_proba(X)
+        return proba @ self.jam_matrix, proba @ self.peak_matrix
@@ -0,0 +1,61 @@
+# ==============================================================================
+# labels.py - Vectorized daily Peak / Shoulder / Off-Peak target labelling
+# ==============================================================================
+import numpy as np
+
+PEAK_QUANTILE = 0.75      # top 25% of a day's hours are Peak
+OFF_PEAK_QUANTILE = 0.25  # bottom 25% are Off-Peak
+
+
+def _group_quantiles(codes, values, n_groups, quantiles):
+    """Per-group linear-interpolation quantiles of ``values``, ignoring NaN.
+
+    Sorts once by (group, value) and interpolates exactly as
+    ``np.percentile(method='linear')`` does (and so ``Series.quantile``),
+    including its ``b - (b - a) * (1 - t)`` form for ``t >= 0.5``, so the
+    thresholds are bit-identical to a per-group ``quantile`` call.
+    """
+    valid = ~np.isnan(values)
+    order = np.lexsort((values, codes))
+    order = order[valid[order]]
+    sorted_values = values[order]
+    counts = np.bincount(codes[valid], minlength=n_groups)
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+
+    results = []
+    for q in quantiles:
+        result = np.full(n_groups, np.nan)
+        has_values = counts > 0
+        n = counts[has_values].astype(np.float64)
+        virtual_index = n * q - q
+        lower = np.floor(virtual_index)
+        t = virtual_index - lower
+        start = starts[has_values]
+        a = sorted_values[start + lower.astype(np.intp)]
+        b = sorted_values[start + np.minimum(lower + 1, n - 1).astype(np.intp)]
+        diff = b - a
+        result[has_values] = np.where(t >= 0.5, b - diff * (1 - t), a + diff * t)
+        results.append(result)
+    return results
+
+
+def daily_peak_category(df, value_column='total_traffic', by=None):
+    """Label every row Peak / Off-Peak / Shoulder against its own day's traffic quantiles.
+
+    Equivalent to the notebook's
+    ``df.groupby(df['datetime'].dt.date).apply(assign_daily_peak_category)``
+    but in one vectorized pass: rows at or above the day's 75th percentile
+    are Peak, rows below its 25th percentile Off-Peak, the rest Shoulder.
+    Pass ``by`` (a column name or list) to compute days per sensor, e.g.
+    ``by='sensor_id'``. Returns an array aligned with ``df``'s rows.
+    """
+    keys = [df['datetime'].dt.normalize()]
+    if by is not None:
+        keys += [df[column] for column in ([by] if isinstance(by, str) else by)]
+    codes = df.groupby(keys, sort=False, dropna=False).ngroup().to_numpy()
+    values = df[value_column].to_numpy(dtype=np.float64)
+
+    off_peak, peak = _group_quantiles(codes, values, codes.max() + 1 if len(codes) else 0,
+                                      [OFF_PEAK_QUANTILE, PEAK_QUANTILE])
+    conditions = [values >= peak[codes], values < off_peak[codes]]
+    return np.select(conditions, ['Peak', 'Off-Peak'], default='Shoulder')
@@ -0,0 +1,224 @@
+# ==============================================================================
+# predict.py - Jam / peak inference shared by the dashboard and the API
+# ==============================================================================
+# NumPy, pandas, joblib and the compiled model code are imported on first
+# use, so importing this module costs milliseconds.
+import hashlib
+import logging
+import os
+
+from .data import HISTORY_CSV
+
+logger = logging.getLogger(__name__)
+
+MODEL_JAM_FILE = 'model_jam_classifier.joblib'
+MODEL_PEAK_FILE = 'model_peak_classifier.joblib'
+MODEL_JOINT_FILE = 'model_joint_classifier.joblib'
+CALIBRATION_FILE = 'calibration.joblib'
+PREPROCESSOR_FILE = 'preprocessor.joblib'
+
+def models_hash(model_dir='.'):
+    """SHA-256 over the two forests and the preprocessor: one trained artifact set."""
+    digest = hashlib.sha256()
+    for name in (MODEL_JAM_FILE, MODEL_PEAK_FILE, PREPROCESSOR_FILE):
+        with open(os.path.join(model_dir, name), 'rb') as f:
+            digest.update(hashlib.file_digest(f, 'sha256').digest())
+    return digest.hexdigest()
+
+
+WEATHER_DEFAULTS = {
+    'temperature_2m': 25.0,
+    'relative_humidity_2m': 70.0,
+    'weathercode': 0,
+    'windspeed_10m': 5.0,
+}
+
+
+class Predictor:
+    """The two forests, the featurizer and the history index, loaded once.
+
+    With a ``joint`` model (see joint.py) ``model_jam`` and ``model_peak``
+    are its single-target views and ``predict`` traverses it once for both
+    labels. ``calibration`` maps each model's probabilities to calibrated
+    ones (see calibration.py). Everything here is read-only after construction, so one instance can
+    be shared by all threads of a process.
+    """
+
+    def __init__(self, model_jam, model_peak, featurizer, df_historical, history, joint=None, calibration=None):
+        self.model_jam = model_jam
+        self.model_peak = model_peak
+        self.featurizer = featurizer
+        self.df_historical = df_historical
+        self.history = history
+        self.joint = joint
+        self.calibration = calibration or {}
+        # Column of predict_proba holding P(jam)
+        self.jam_column = list(model_jam.classes_).index(True)
+
+    @classmethod
+    def load(cls, model_dir='.', history_csv=HISTORY_CSV, compiled=True, joint=False, calibrated=True):
+        """Load the three joblib artifacts and the history from ``model_dir``.
+
+        ``history_csv=None`` skips the history (enough for scoring feature
+        rows). ``compiled=False`` keeps the sklearn forests, which are
+        faster than ``CompiledForest`` on batches of many thousand rows.
+        ``joint=True`` serves the single jam + peak model written by
+        ``python -m melakago.train --joint`` instead of the two forests.
+        Probabilities are calibrated when ``calibrated`` and a calibration
+        file fitted to these artifacts (same ``models_hash``) sits next to
+        them; one left over from other models is skipped with a warning.
+        There is no calibration for the joint model, so ``joint=True``
+        needs ``calibrated=False``.
+        """
+        import joblib
+
+        from .data import load_history
+        from .features import Featurizer
+        from .forest import load_compiled
+        from .history import HistoryIndex
+
+        if joint and calibrated:
+            raise ValueError("The joint model has no calibration; load it with calibrated=False.")
+        joint_model = None
+        if joint:
+            # Its forest is compiled and memory-mapped like the two below
+            joint_path = os.path.join(model_dir, MODEL_JOINT_FILE)
+            joint_model = load_compiled(joint_path) if compiled else joblib.load(joint_path)
+            model_jam, model_peak = joint_model.jam, joint_model.peak
+        elif compiled:
+            # Forests are served as NumPy node arrays, memory-mapped from a dump
+            # shared by every process (see forest.py); other model types (see
+            # selection.py) are used as they are
+            model_jam = load_compiled(os.path.join(model_dir, MODEL_JAM_FILE))
+            model_peak = load_compiled(os.path.join(model_dir, MODEL_PEAK_FILE))
+        else:
+            model_jam = joblib.load(os.path.join(model_dir, MODEL_JAM_FILE))
+            model_peak = joblib.load(os.path.join(model_dir, MODEL_PEAK_FILE))
+        calibration = None
+        calibration_path = os.path.join(model_dir, CALIBRATION_FILE)
+        if calibrated and os.path.exists(calibration_path):
+            stored = joblib.load(calibration_path)
+            if isinstance(stored, dict) and stored.get('models_hash') == models_hash(model_dir):
+                calibration = {target: stored[target] for target in ('jam', 'peak')}
+            else:
+                logger.warning("%s was fitted to other models; serving uncalibrated probabilities. "
+                               "Run python -m melakago.calibration to refit it.", calibration_path)
+        # The fitted preprocessor is replayed with NumPy; see features.py
+        featurizer = Featurizer(joblib.load(os.path.join(model_dir, PREPROCESSOR_FILE)))
+        if history_csv is None:
+            return cls(model_jam, model_peak, featurizer, None, None, joint_model, calibration)
+        # Typed Feather cache of the CSV when available; see data.py
+        df_historical = load_history(os.path.join(model_dir, history_csv))
+        return cls(model_jam, model_peak, featurizer, df_historical, HistoryIndex(df_historical), joint_model,
+                   calibration)
+
+    def featurize_day(self, weather_by_hour, selected_date, is_holiday):
+        """Build the model feature matrix for a day of hourly weather rows indexed by hour."""
+        weather = {
+            column: weather_by_hour[column].to_numpy() if column in weather_by_hour.columns else default_value
+            for column, default_value in WEATHER_DEFAULTS.items()
+        }
+        return self.featurizer.transform(
+            hour=weather_by_hour.index.to_numpy(),
+            day_of_week=selected_date.strftime('%A'),
+            month=selected_date.month,
+            is_weekend=(selected_date.weekday() >= 5),
+            is_holiday_mlk=bool(is_holiday),
+            **weather,
+        )
+
+    def featurize_rows(self, rows):
+        """Feature matrix for a DataFrame of hourly rows with the training columns.
+
+        ``rows`` needs ``hour``, ``day_of_week``, ``month`` (name or number),
+        ``is_weekend``, ``is_holiday_mlk`` and the weather columns; missing
+        weather columns take ``WEATHER_DEFAULTS``.
+        """
+        from .features import MONTH_MAP
+
+        month = rows['month']
+        if month.dtype == object or str(month.dtype) == 'category':
+            month = month.map(MONTH_MAP).fillna(1)  # unknown names fall back to January, as app.py did
+        weather = {
+            column: rows[column].to_numpy() if column in rows.columns else default_value
+            for column, default_value in WEATHER_DEFAULTS.items()
+        }
+        return self.featurizer.transform(
+            hour=rows['hour'].to_numpy(),
+            day_of_week=rows['day_of_week'].astype(str).to_numpy(),
+            month=month.to_numpy(dtype=float),
+            is_weekend=rows['is_weekend'].to_numpy(dtype=bool),
+            is_holiday_mlk=rows['is_holiday_mlk'].to_numpy(dtype=bool),
+            **weather,
+        )
+
+    def predict(self, X_processed):
+        """Labels and probabilities for a feature matrix, one traversal per model (one in all if joint).
+
+        Returns a dict of arrays: ``is_jam``, ``jam_probability``,
+        ``peak_category``, ``peak_proba`` (one column per entry of
+        ``model_peak.classes_``) and ``jam_confidence`` /
+        ``peak_confidence`` (the probability of the predicted label). Labels
+        are the forests' majority votes, as ``.predict`` gives; the
+        probabilities are calibrated from the same votes when calibration
+        is loaded.
+        """
+        import numpy as np
+
+        if self.joint is not None:
+            jam_proba, peak_proba = self.joint.predict_proba(X_processed)
+        else:
+            jam_proba = self.model_jam.predict_proba(X_processed)
+            peak_proba = self.model_peak.predict_proba(X_processed)
+        jam_index, peak_index = np.argmax(jam_proba, axis=1), np.argmax(peak_proba, axis=1)
+        if self.calibration:
+            jam_proba = self.calibration['jam'].transform(jam_proba)
+            peak_proba = self.calibration['peak'].transform(peak_proba)
+        rows = np.arange(len(jam_index))
+        return {
+            'is_jam': self.model_jam.classes_.take(jam_index),
+            'jam_probability': jam_proba[:, self.jam_column],
+            'jam_confidence': jam_proba[rows, jam_index],
+            'peak_category': self.model_peak.classes_.take(peak_index),
+            'peak_proba': peak_proba,
+            'peak_confidence': peak_proba[rows, peak_index],
+        }
+
+    def predict_day_grid(self, weather_by_hour, selected_date, is_holiday):
+        """Predict jam and peak labels for every hour of a day in one batched call per model."""
+        import pandas as pd
+
+        X_processed = self.featurize_day(weather_by_hour, selected_date, is_holiday)
+        result = self.predict(X_processed)
+        grid = pd.DataFrame(index=weather_by_hour.index)
+        for column, default_value in WEATHER_DEFAULTS.items():
+            grid[column] = weather_by_hour[column] if column in weather_by_hour.columns else default_value
+        grid['is_jam'] = result['is_jam']
+        grid['peak_category'] = result['peak_category']
+        grid['jam_probability'] = result['jam_probability']
+        grid['jam_confidence'] = result['jam_confidence']
+        grid['peak_confidence'] = result['peak_confidence']
+        for i, category in enumerate(self.model_peak.classes_):
+            grid[f'prob_{category}'] = result['peak_proba'][:, i]
+        return grid
+
+    def day_weather(self, selected_date, use_forecast, forecast_df=None):
+        """Hourly weather rows (indexed by hour) for a date and where they came from.
+
+        The source is "forecast" for live weather, "pattern" when a forecast
+        was wanted but ``forecast_df`` is missing or empty and historical
+        hours were substituted, or "historical".
+        """
+        if not use_forecast:
+            return self.history.day_weather(selected_date), "historical"
+        if forecast_df is not None and not forecast_df.empty:
+            weather_by_hour = (forecast_df.assign(hour=forecast_df['datetime'].dt.hour)
+                               .drop_duplicates('hour').set_index('hour'))
+            return weather_by_hour, "forecast"
+        return self.history.hourly_pattern(), "pattern"
+
+    def day_grid(self, selected_date, use_forecast, forecast_df=None):
+        """The 24-hour prediction grid for a date and its weather source."""
+        weather_by_hour, source = self.day_weather(selected_date, use_forecast, forecast_df)
+        grid = self.predict_day_grid(weather_by_hour, selected_date, self.history.is_holiday(selected_date))
+        return grid, source
@@ -0,0 +1,168 @@
+# ==============================================================================
+# score.py - Streaming bulk scorer for CSV / Parquet files of hourly rows
+# ==============================================================================
+# Run from the project root (needs the three .joblib artifacts):
+#     python -m melakago.score INPUT OUTPUT [--workers 4] [--chunksize 50000]
+#
+# INPUT and OUTPUT may each be .csv or .parquet. Every input column is kept
+# and predicted_jam, predicted_jam_label, predicted_peak_category,
+# jam_probability, jam_confidence and peak_confidence are appended.
+import argparse
+import logging
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from .predict import Predictor
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNKSIZE = 50_000
+TIME_COLUMNS = ['hour', 'day_of_week', 'month', 'is_weekend']
+
+_predictor = None  # one per worker process, loaded by _init_worker
+
+
+def _is_parquet(path):
+    return os.path.splitext(path)[1].lower() in ('.parquet', '.pq')
+
+
+def iter_chunks(path, chunksize=DEFAULT_CHUNKSIZE):
+    """Yield DataFrames of at most ``chunksize`` rows from a CSV or Parquet file."""
+    if _is_parquet(path):
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize):
+            yield batch.to_pandas()
+    else:
+        import pandas as pd
+
+        yield from pd.read_csv(path, chunksize=chunksize)
+
+
+def add_time_columns(chunk):
+    """Derive hour / day_of_week / month / is_weekend from ``datetime`` where missing."""
+    import pandas as pd
+
+    missing = [column for column in TIME_COLUMNS if column not in chunk.columns]
+    if missing:
+        if 'datetime' not in chunk.columns:
+            raise ValueError(f"Input is missing {missing} and has no 'datetime' to derive them from.")
+        when = pd.to_datetime(chunk['datetime'])
+        derived = {
+            'hour': when.dt.hour,
+            'day_of_week': when.dt.day_name(),
+            'month': when.dt.month_name(),
+            'is_weekend': when.dt.dayofweek >= 5,
+        }
+        chunk = chunk.assign(**{column: derived[column] for column in missing})
+    if 'is_holiday_mlk' not in chunk.columns:
+        raise ValueError("Input is missing 'is_holiday_mlk'.")
+    return chunk
+
+
+def _init_worker(model_dir):
+    global _predictor
+    # The sklearn forests beat CompiledForest on chunks of thousands of rows
+    _predictor = Predictor.load(model_dir, history_csv=None, compiled=False)
+    for model in (_predictor.model_jam, _predictor.model_peak):
+        model.n_jobs = 1  # the pool already uses every core
+
+
+def score_chunk(chunk):
+    """Predictions for one chunk as a dict of arrays (runs in a worker)."""
+    result = _predictor.predict(_predictor.featurize_rows(add_time_columns(chunk)))
+    return {
+        'predicted_jam': result['is_jam'],
+        'predicted_peak_category': result['peak_category'],
+        'jam_probability': result['jam_probability'],
+        'jam_confidence': result['jam_confidence'],
+        'peak_confidence': result['peak_confidence'],
+    }
+
+
+class _Writer:
+    """Appends scored chunks to a CSV or Parquet file as they arrive."""
+
+    def __init__(self, path):
+        self.path = path
+        self.parquet = _is_parquet(path)
+        self._parquet_writer = None
+        self._first = True
+
+    def write(self, chunk):
+        if self.parquet:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if self._parquet_writer is None:
+                self._parquet_writer = pq.ParquetWriter(self.path, table.schema)
+            self._parquet_writer.write_table(table)
+        else:
+            chunk.to_csv(self.path, mode='w' if self._first else 'a', header=self._first, index=False)
+        self._first = False
+
+    def close(self):
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+
+
+def score_file(input_path, output_path, workers=None, chunksize=DEFAULT_CHUNKSIZE, model_dir='.'):
+    """Score ``input_path`` chunk by chunk and write ``output_path``; returns the row count.
+
+    At most ``2 * workers`` chunks are in flight, so memory stays bounded
+    by the chunk size whatever the input size. Output rows keep the input
+    order. ``workers=0`` scores in this process.
+    """
+    workers = os.cpu_count() if workers is None else workers
+    writer = _Writer(output_path)
+    rows = 0
+
+    def emit(chunk, predictions):
+        nonlocal rows
+        chunk = chunk.assign(**predictions)
+        chunk['predicted_jam_label'] = chunk['predicted_jam'].map({True: 'Jam Likely', False: 'No Jam'})
+        writer.write(chunk)
+        rows += len(chunk)
+
+    try:
+        if workers == 0:
+            _init_worker(model_dir)
+            for chunk in iter_chunks(input_path, chunksize):
+                emit(chunk, score_chunk(chunk))
+        else:
+            with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(model_dir,)) as pool:
+                pending = deque()
+                for chunk in iter_chunks(input_path, chunksize):
+                    pending.append((chunk, pool.submit(score_chunk, chunk)))
+                    if len(pending) >= 2 * workers:
+                        chunk, future = pending.popleft()
+                        emit(chunk, future.result())
+                while pending:
+                    chunk, future = pending.popleft()
+                    emit(chunk, future.result())
+    finally:
+        writer.close()
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Score a CSV/Parquet file of hourly rows with the jam and peak models")
+    parser.add_argument('input')
+    parser.add_argument('output')
+    parser.add_argument('--workers', type=int, default=None, help="processes (default: CPU count; 0 = in-process)")
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE)
+    parser.add_argument('--model-dir', default='.')
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    start = time.perf_counter()
+    try:
+        n_rows = score_file(args.input, args.output, args.workers, args.chunksize, args.model_dir)
+    except ValueError as e:
+        sys.exit(f"error: {e}")
+    elapsed = time.perf_counter() - start
+    logger.info("Scored %d rows in %.1fs (%.0f rows/s) -> %s", n_rows, elapsed, n_rows / elapsed, args.output)
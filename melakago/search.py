@@ -0,0 +1,155 @@
+# ==============================================================================
+# search.py - "Best time to travel" search over the forecast horizon
+# ==============================================================================
+from datetime import datetime, timedelta
+
+from .advice import RAIN_WEATHERCODE
+from .forecast import forecast_range_for
+from .weather import FORECAST_HORIZON_DAYS
+
+DEFAULT_TOP_K = 5
+HEATMAP_DAYS = 7
+
+
+def horizon_weather(predictor, forecasts, lat, lon, start_date, days):
+    """Hourly weather for ``days`` days from ``start_date`` and where it came from.
+
+    Served from the same cached horizon response as the dashboard. If the
+    forecast cannot be fetched, every day gets the historical hourly
+    pattern and the source is "pattern".
+    """
+    import pandas as pd
+    import requests
+
+    days = max(1, min(days, FORECAST_HORIZON_DAYS - (start_date - datetime.now().date()).days))
+    end = pd.Timestamp(start_date + timedelta(days=days))
+    try:
+        frame = forecasts.get_range(lat, lon, *forecast_range_for(start_date.isoformat()))
+        frame = frame[(frame['datetime'] >= pd.Timestamp(start_date)) & (frame['datetime'] < end)]
+        if not frame.empty:
+            return frame.reset_index(drop=True), "forecast"
+    except requests.exceptions.RequestException:
+        pass
+    pattern = predictor.history.hourly_pattern()
+    frames = []
+    for offset in range(days):
+        day = pd.Timestamp(start_date + timedelta(days=offset))
+        frames.append(pattern.assign(datetime=day + pd.to_timedelta(pattern.index, unit='h')))
+    return pd.concat(frames, ignore_index=True), "pattern"
+
+
+def score_hours(predictor, weather):
+    """Predictions for every row of an hourly weather frame, in one featurize + predict pass.
+
+    Returns ``weather`` with is_jam, jam_probability, peak_category,
+    offpeak_probability and risk (jam_probability + 1 - offpeak_probability,
+    lower is better) added.
+    """
+    import numpy as np
+
+    when = weather['datetime']
+    holidays = {day: predictor.history.is_holiday(day) for day in set(when.dt.date)}
+    rows = weather.assign(
+        hour=when.dt.hour,
+        day_of_week=when.dt.day_name(),
+        month=when.dt.month,
+        is_weekend=when.dt.dayofweek >= 5,
+        is_holiday_mlk=when.dt.date.map(holidays).astype(bool),
+    )
+    result = predictor.predict(predictor.featurize_rows(rows))
+    offpeak_column = list(predictor.model_peak.classes_).index('Off-Peak')
+    scored = weather.assign(
+        is_jam=result['is_jam'],
+        jam_probability=result['jam_probability'],
+        peak_category=result['peak_category'],
+        offpeak_probability=result['peak_proba'][:, offpeak_column],
+    )
+    scored['risk'] = scored['jam_probability'] + 1 - scored['offpeak_probability']
+    if 'weathercode' not in scored.columns:
+        scored['weathercode'] = np.zeros(len(scored), dtype=int)
+    return scored
+
+
+def best_windows(scored, top_k=DEFAULT_TOP_K, window_hours=1, hour_range=None, not_before=None):
+    """The ``top_k`` lowest-risk, non-overlapping windows of ``window_hours`` consecutive hours.
+
+    Every hour in a window must be predicted jam-free and Off-Peak with a
+    weathercode below 61 (no rain), fall inside ``hour_range`` (inclusive
+    (first, last) hour of day, if given) and start at or after
+    ``not_before``. Windows are ranked by their mean risk.
+
+    Returns a DataFrame with one row per window: start, end, risk (mean),
+    jam_probability (max), offpeak_probability (min), temperature_2m
+    (mean) and weathercode (max).
+    """
+    import numpy as np
+    import pandas as pd
+
+    when = scored['datetime']
+    ok = ((~scored['is_jam'].astype(bool)) & (scored['peak_category'] == 'Off-Peak')
+          & (scored['weathercode'] < RAIN_WEATHERCODE)).to_numpy()
+    if hour_range is not None:
+        first, last = hour_range
+        ok &= ((when.dt.hour >= first) & (when.dt.hour <= last)).to_numpy()
+    if not_before is not None:
+        ok &= (when >= not_before).to_numpy()
+
+    # A window starting at row i covers rows i .. i + window_hours - 1; they
+    # must all be ok and exactly one hour apart
+    hourly = np.concatenate([[False], np.diff(when.to_numpy()) == np.timedelta64(1, 'h')])
+    n_starts = max(len(scored) - window_hours + 1, 0)
+    valid = np.ones(n_starts, dtype=bool)
+    risk_sum = np.zeros(n_starts)
+    risk = scored['risk'].to_numpy()
+    for offset in range(window_hours):
+        valid &= ok[offset:offset + n_starts]
+        if offset:
+            valid &= hourly[offset:offset + n_starts]
+        risk_sum += risk[offset:offset + n_starts]
+
+    chosen, taken = [], np.zeros(len(scored), dtype=bool)
+    for start in np.flatnonzero(valid)[np.argsort(risk_sum[valid], kind='stable')]:
+        if not taken[start:start + window_hours].any():
+            chosen.append(start)
+            taken[start:start + window_hours] = True
+            if len(chosen) == top_k:
+                break
+
+    windows = []
+    for start in chosen:
+        hours = scored.iloc[start:start + window_hours]
+        windows.append({
+            'start': hours['datetime'].iloc[0],
+            'end': hours['datetime'].iloc[-1] + timedelta(hours=1),
+            'risk': risk_sum[start] / window_hours,
+            'jam_probability': hours['jam_probability'].max(),
+            'offpeak_probability': hours['offpeak_probability'].min(),
+            'temperature_2m': hours['temperature_2m'].mean() if 'temperature_2m' in hours else float('nan'),
+            'weathercode': int(hours['weathercode'].max()),
+        })
+    return pd.DataFrame(windows, columns=['start', 'end', 'risk', 'jam_probability', 'offpeak_probability',
+                                          'temperature_2m', 'weathercode'])
+
+
+def best_travel_times(predictor, forecasts, lat, lon, start_date, days, top_k=DEFAULT_TOP_K,
+                      window_hours=1, hour_range=None, not_before=None):
+    """Search the next ``days`` days at one location; returns (windows, weather source)."""
+    weather, source = horizon_weather(predictor, forecasts, lat, lon, start_date, days)
+    scored = score_hours(predictor, weather)
+    return best_windows(scored, top_k, window_hours, hour_range, not_before), source
+
+
+def congestion_heatmap(predictor, forecasts, lat, lon, start_date, days=HEATMAP_DAYS):
+    """Day x hour predictions for the next ``days`` days; returns (rows, weather source).
+
+    All ``days * 24`` hours are scored in a single batch. Rows carry date,
+    hour, jam_probability, peak_category, weathercode and temperature_2m.
+    """
+    weather, source = horizon_weather(predictor, forecasts, lat, lon, start_date, days)
+    scored = score_hours(predictor, weather)
+    scored['date'] = scored['datetime'].dt.normalize()
+    scored['hour'] = scored['datetime'].dt.hour
+    columns = ['date', 'hour', 'jam_probability', 'peak_category', 'weathercode']
+    if 'temperature_2m' in scored.columns:
+        columns.append('temperature_2m')
+    return scored[columns], source
@@ -0,0 +1,219 @@
+# ==============================================================================
+# selection.py - Latency-budgeted choice of the deployed jam / peak models
+# ==============================================================================
+# Run from the project root:
+#     python -m melakago.selection [--budget-ms 5] [--out-dir .]
+#
+# Every candidate model family is fitted per target on the search split of
+# the cached training prep (see train.py) and measured as the app would
+# serve it: validation accuracy and macro F1, single-row and 24-row
+# predict_proba latency, memory held after loading, and joblib file size.
+# The most accurate candidate whose 24-row latency fits the budget is
+# refitted on the full training split and written, with its calibration,
+# as the deployable artifact set; the comparison goes to SELECTION_FILE.
+# XGBoost is included when the xgboost package is installed.
+import argparse
+import json
+import logging
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from .calibration import write_calibration
+from .dashboard import SOURCE_CSV
+from .predict import PREPROCESSOR_FILE
+from .train import DEFAULT_CACHE_DIR, MODEL_FILES, NOTEBOOK_PARAMS, PREPARE_CONFIG, TARGETS, load_or_prepare
+
+logger = logging.getLogger(__name__)
+
+SELECTION_FILE = 'model_selection.json'
+LATENCY_BUDGET_MS = 5.0  # per model, for the 24-row day grid
+BATCH_SIZES = [1, 24]
+LATENCY_REPEATS = 200
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class EncodedClassifier:
+    """Wraps a classifier that needs integer labels (XGBoost) behind the original classes.
+
+    ``classes_`` holds the original labels, so Predictor can use the
+    wrapped model like the sklearn ones.
+    """
+
+    def __init__(self, model):
+        self.model = model
+
+    def fit(self, X, y):
+        import numpy as np
+
+        self.classes_, codes = np.unique(y, return_inverse=True)
+        self.model.fit(X, codes)
+        return self
+
+    def predict_proba(self, X):
+        return self.model.predict_proba(X)
+
+    def predict(self, X):
+        import numpy as np
+
+        return self.classes_.take(np.argmax(self.predict_proba(X), axis=1))
+
+
+def candidate_models(random_state=PREPARE_CONFIG['random_state']):
+    """Factories of unfitted candidates by name; XGBoost only when it is installed."""
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.linear_model import LogisticRegression
+
+    candidates = {
+        'random_forest': lambda: RandomForestClassifier(random_state=random_state, n_jobs=-1, **NOTEBOOK_PARAMS),
+        'random_forest_small': lambda: RandomForestClassifier(
+            n_estimators=25, min_samples_leaf=3, random_state=random_state, n_jobs=-1),
+        'logistic_regression': lambda: LogisticRegression(max_iter=2000, random_state=random_state),
+    }
+    try:
+        import xgboost
+    except ImportError:
+        logger.info("xgboost is not installed; skipping the XGBoost candidate")
+    else:
+        candidates['xgboost'] = lambda: EncodedClassifier(
+            xgboost.XGBClassifier(random_state=random_state, n_jobs=1))
+    return candidates
+
+
+def serving_form(model):
+    """The model as Predictor.load serves it (forests are compiled)."""
+    from .forest import CompiledForest
+
+    return CompiledForest(model) if hasattr(model, 'estimators_') else model
+
+
+def latency_ms(model, X, repeats=LATENCY_REPEATS):
+    """Median predict_proba time in milliseconds for the rows of ``X``."""
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        model.predict_proba(X)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+
+def measure(model, X_val, y_val, scratch_dir):
+    """Accuracy, macro F1, latencies, loaded memory and artifact size of a fitted model."""
+    import joblib
+    import numpy as np
+    from sklearn.metrics import accuracy_score, f1_score
+
+    path = os.path.join(scratch_dir, 'candidate.joblib')
+    joblib.dump(model, path)
+    tracemalloc.start()
+    served = serving_form(joblib.load(path))
+    memory_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    X_val = np.asarray(X_val, dtype=np.float32)  # what the featurizer produces
+    predicted = model.predict(X_val)
+    metrics = {
+        'accuracy': float(accuracy_score(y_val, predicted)),
+        'f1_macro': float(f1_score(y_val, predicted, average='macro')),
+        'memory_kb': round(memory_bytes / 1024, 1),
+        'artifact_kb': round(os.path.getsize(path) / 1024, 1),
+    }
+    for size in BATCH_SIZES:
+        metrics[f'latency_{size}_ms'] = round(latency_ms(served, X_val[:size]), 3)
+    return metrics
+
+
+def choose(results, budget_ms=LATENCY_BUDGET_MS):
+    """Name of the best macro F1 within ``budget_ms`` for 24 rows (else the fastest candidate)."""
+    within = {name: m for name, m in results.items() if m['latency_24_ms'] <= budget_ms}
+    if not within:
+        logger.warning("No candidate serves 24 rows within %.1f ms; taking the fastest", budget_ms)
+        return min(results, key=lambda name: results[name]['latency_24_ms'])
+    return max(within, key=lambda name: (within[name]['f1_macro'], -within[name]['latency_24_ms']))
+
+
+def check_artifacts(out_dir):
+    """Load the artifact set in ``out_dir`` in a fresh interpreter, as app.py, the API and the scorer do.
+
+    A model whose class the serving code cannot import (e.g. one pickled
+    as ``__main__.EncodedClassifier``) fails here instead of in production.
+    """
+    code = "import sys; from melakago.predict import Predictor; Predictor.load(sys.argv[1], history_csv=None)"
+    result = subprocess.run([sys.executable, '-c', code, os.path.abspath(out_dir)],
+                            cwd=PROJECT_ROOT, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"The models written to {out_dir} do not load in a fresh interpreter:\n{result.stderr}")
+
+
+def select_models(source_path=SOURCE_CSV, out_dir='.', cache_dir=DEFAULT_CACHE_DIR, budget_ms=LATENCY_BUDGET_MS):
+    """Compare the candidates per target, write the chosen artifact set; returns the report.
+
+    The written set is reloaded in a fresh interpreter (see check_artifacts)
+    before SELECTION_FILE is written.
+    """
+    import joblib
+    from sklearn.metrics import accuracy_score, f1_score
+
+    prepared_path, _ = load_or_prepare(source_path, cache_dir)
+    prepared = joblib.load(prepared_path)
+    candidates = candidate_models()
+    report = {'budget_ms': budget_ms, 'targets': {}}
+    chosen_models = {}
+    os.makedirs(out_dir, exist_ok=True)
+
+    with tempfile.TemporaryDirectory() as scratch_dir:
+        for target in TARGETS:
+            sets = prepared['targets'][target]
+            results = {}
+            for name, factory in candidates.items():
+                start = time.perf_counter()
+                model = factory().fit(sets['X_fit'], sets['y_fit'])
+                fit_seconds = time.perf_counter() - start
+                results[name] = measure(model, sets['X_val'], sets['y_val'], scratch_dir)
+                results[name]['fit_seconds'] = round(fit_seconds, 2)
+                logger.info("%s / %s: %s", target, name, results[name])
+
+            chosen = choose(results, budget_ms)
+            model = candidates[chosen]().fit(sets['X_train'], sets['y_train'])
+            predicted = model.predict(sets['X_test'])
+            joblib.dump(model, os.path.join(out_dir, MODEL_FILES[target]))
+            chosen_models[target] = model
+            report['targets'][target] = {
+                'chosen': chosen,
+                'test_accuracy': float(accuracy_score(sets['y_test'], predicted)),
+                'test_f1_macro': float(f1_score(sets['y_test'], predicted, average='macro')),
+                'candidates': results,
+            }
+    joblib.dump(prepared['preprocessor'], os.path.join(out_dir, PREPROCESSOR_FILE))
+    report['calibration'] = write_calibration(chosen_models, prepared, out_dir)
+    check_artifacts(out_dir)
+    with open(os.path.join(out_dir, SELECTION_FILE), 'w') as f:
+        json.dump(report, f, indent=2)
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pick the jam and peak models under a latency budget")
+    parser.add_argument('--source', default=SOURCE_CSV)
+    parser.add_argument('--out-dir', default='.')
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR)
+    parser.add_argument('--budget-ms', type=float, default=LATENCY_BUDGET_MS,
+                        help="max median predict_proba time per model for 24 rows")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    # Through the package module, so a pickled EncodedClassifier is melakago.selection's, not __main__'s
+    from . import selection
+
+    report = selection.select_models(args.source, args.out_dir, args.cache_dir, args.budget_ms)
+    print(f"{'target':<6} {'candidate':<20} {'acc':>6} {'F1':>6} {'1 row':>8} {'24 rows':>8} {'mem KB':>8} {'file KB':>8}")
+    for target, summary in report['targets'].items():
+        for name, m in summary['candidates'].items():
+            mark = '*' if name == summary['chosen'] else ' '
+            print(f"{target:<6} {name + mark:<20} {m['accuracy']:6.3f} {m['f1_macro']:6.3f} "
+                  f"{m['latency_1_ms']:6.3f}ms {m['latency_24_ms']:6.3f}ms {m['memory_kb']:8.1f} {m['artifact_kb']:8.1f}")
+    logger.info("Chosen (*) models refitted and written to %s", os.path.abspath(args.out_dir))
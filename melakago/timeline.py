@@ -0,0 +1,67 @@
+# ==============================================================================
+# timeline.py - Compact JSON payload of a day's hourly predictions for the browser
+# ==============================================================================
+import math
+
+from .advice import get_weather_icon_and_desc, travel_advice
+from .predict import WEATHER_DEFAULTS
+
+PAYLOAD_VERSION = 2
+
+
+def _number(value, digits):
+    """``value`` rounded for JSON, or None where the forecast has a gap (NaN)."""
+    value = float(value)
+    if math.isnan(value):
+        return None
+    return int(round(value)) if digits == 0 else round(value, digits)
+
+
+def _intern(table, index, value):
+    """Index of ``value`` in ``table``, appending it the first time it is seen."""
+    if value not in index:
+        index[value] = len(table)
+        table.append(value)
+    return index[value]
+
+
+def day_payload(grid, selected_date, source):
+    """Everything needed to show any hour of a prediction grid, as plain JSON types.
+
+    Per-hour values are columns (lists aligned with ``hours``). Strings
+    that repeat across hours (traffic levels, weather descriptions, travel
+    advice) are sent once in a lookup table and referenced by index, so a
+    full day is a couple of kilobytes. Weather gaps in the forecast (nulls
+    from Open-Meteo) are sent as null and shown as missing; a missing
+    weather code is described and advised on as WEATHER_DEFAULTS' code.
+    """
+    peaks, peak_index = [], {}
+    weather_kinds, weather_index = [], {}
+    advice_kinds, advice_index = [], {}
+    payload = {
+        'version': PAYLOAD_VERSION,
+        'date': selected_date.isoformat(),
+        'source': source,
+        'hours': [int(hour) for hour in grid.index],
+        'jam': [int(bool(jam)) for jam in grid['is_jam']],
+        'jam_pct': [int(round(p * 100)) for p in grid['jam_probability']],
+        'jam_conf': [int(round(p * 100)) for p in grid['jam_confidence']],
+        'peak_conf': [int(round(p * 100)) for p in grid['peak_confidence']],
+        'temp': [_number(t, 1) for t in grid['temperature_2m']],
+        'humidity': [_number(h, 0) for h in grid['relative_humidity_2m']],
+        'wind': [_number(w, 1) for w in grid['windspeed_10m']],
+        'peak': [],
+        'weather': [],
+        'advice': [],
+    }
+    for weathercode, peak_category in zip(grid['weathercode'], grid['peak_category']):
+        weathercode = _number(weathercode, 0)
+        if weathercode is None:
+            weathercode = WEATHER_DEFAULTS['weathercode']
+        payload['peak'].append(_intern(peaks, peak_index, str(peak_category)))
+        payload['weather'].append(_intern(weather_kinds, weather_index, get_weather_icon_and_desc(weathercode)))
+        payload['advice'].append(_intern(advice_kinds, advice_index, travel_advice(weathercode, peak_category)))
+    payload['peaks'] = peaks
+    payload['weather_kinds'] = [list(kind) for kind in weather_kinds]
+    payload['advice_kinds'] = [advice._asdict() for advice in advice_kinds]
+    return payload
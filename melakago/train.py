@@ -0,0 +1,345 @@
+# ==============================================================================
+# train.py - Reproducible training of the jam / peak forests with a cached prep step
+# ==============================================================================
+# Run from the project root:
+#     python -m melakago.train [--out-dir .] [--workers N] [--no-search]
+#
+# Scripted version of 03_FinalModellingPhase.ipynb: daily Peak / Shoulder /
+# Off-Peak labels, the ColumnTransformer fitted on every row, a stratified
+# 80/20 split and SMOTE per target, then one RandomForestClassifier per
+# target. The preprocessed matrix and the SMOTE sets are cached under
+# --cache-dir, keyed by a hash of the source CSV and PREPARE_CONFIG, so only
+# the first run pays for them. The hyperparameter search runs on a process
+# pool; --no-search trains the notebook's parameters and reproduces the
+# committed artifacts. Writes the three .joblib files, their calibration (see
+# calibration.py) and METRICS_FILE, and with --joint also the single jam +
+# peak model of joint.py.
+import argparse
+import hashlib
+import itertools
+import json
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from .calibration import write_calibration
+from .dashboard import SOURCE_CSV
+from .labels import OFF_PEAK_QUANTILE, PEAK_QUANTILE, daily_peak_category
+from .predict import MODEL_JAM_FILE, MODEL_JOINT_FILE, MODEL_PEAK_FILE, PREPROCESSOR_FILE
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = '.train_cache'
+METRICS_FILE = 'training_metrics.json'
+
+# Input features and preprocessing, as in section 3 of the notebook
+FEATURES = ['temperature_2m', 'relative_humidity_2m', 'weathercode', 'windspeed_10m',
+            'is_weekend', 'hour', 'is_holiday_mlk', 'day_of_week', 'month']
+NUMERICAL_FEATURES = ['temperature_2m', 'relative_humidity_2m', 'windspeed_10m',
+                      'hour_sin', 'hour_cos', 'month_sin', 'month_cos']
+CATEGORICAL_FEATURES = ['day_of_week', 'weathercode']
+TARGETS = {'jam': 'is_jam', 'peak': 'peak_category_daily'}
+MODEL_FILES = {'jam': MODEL_JAM_FILE, 'peak': MODEL_PEAK_FILE}
+
+# Everything that shapes the cached matrices; any change gives a new cache key
+PREPARE_CONFIG = {
+    'features': FEATURES,
+    'numerical': NUMERICAL_FEATURES,
+    'categorical': CATEGORICAL_FEATURES,
+    'targets': TARGETS,
+    'peak_quantiles': [OFF_PEAK_QUANTILE, PEAK_QUANTILE],
+    'joint': True,  # also build sets for the joint model, stratified on the (jam, peak) pair
+    'test_size': 0.2,
+    'validation_size': 0.2,  # of the training split, held out for the search
+    'random_state': 42,
+}
+
+NOTEBOOK_PARAMS = {'n_estimators': 100, 'max_depth': None, 'min_samples_leaf': 1, 'max_features': 'sqrt'}
+PARAM_GRID = {
+    'n_estimators': [100, 200],
+    'max_depth': [None, 20],
+    'min_samples_leaf': [1, 3],
+    'max_features': ['sqrt', 0.5],
+}
+
+_prepared = None  # the cached prep, loaded once per search worker by _init_worker
+
+
+def load_training_frame(source_path=SOURCE_CSV):
+    """The source rows with the daily Peak / Shoulder / Off-Peak target added."""
+    import pandas as pd
+
+    df = pd.read_csv(source_path, parse_dates=['datetime'])
+    df['peak_category_daily'] = daily_peak_category(df)
+    return df
+
+
+def feature_frame(df):
+    """The notebook's model inputs: raw features with cyclical hour and month columns."""
+    import numpy as np
+
+    from .features import MONTH_MAP
+
+    X = df[FEATURES].copy()
+    X['hour_sin'] = np.sin(2 * np.pi * X['hour'] / 24)
+    X['hour_cos'] = np.cos(2 * np.pi * X['hour'] / 24)
+    month_num = X['month'].map(MONTH_MAP)
+    X['month_sin'] = np.sin(2 * np.pi * month_num / 12)
+    X['month_cos'] = np.cos(2 * np.pi * month_num / 12)
+    return X.drop(['hour', 'month'], axis=1)
+
+
+def build_preprocessor():
+    from sklearn.compose import ColumnTransformer
+    from sklearn.preprocessing import OneHotEncoder, StandardScaler
+
+    return ColumnTransformer(
+        transformers=[
+            ('num', StandardScaler(), NUMERICAL_FEATURES),
+            ('cat', OneHotEncoder(handle_unknown='ignore'), CATEGORICAL_FEATURES),
+        ],
+        remainder='passthrough',
+    )
+
+
+def cache_key(source_path, config=PREPARE_CONFIG):
+    """SHA-256 prefix over the source CSV, ``config`` and the sklearn / imblearn versions."""
+    import imblearn
+    import sklearn
+
+    digest = hashlib.sha256(json.dumps(
+        [config, sklearn.__version__, imblearn.__version__], sort_keys=True).encode())
+    with open(source_path, 'rb') as f:
+        digest.update(hashlib.file_digest(f, 'sha256').digest())
+    return digest.hexdigest()[:16]
+
+
+def prepare(df, config=PREPARE_CONFIG):
+    """Fit the preprocessor and build the split and SMOTE sets for every target.
+
+    Per target the result holds the test split (``X_test`` / ``y_test``),
+    the SMOTE-balanced training split the final model is fitted on
+    (``X_train`` / ``y_train``) and, for the search, a validation slice of
+    the training split (``X_val`` / ``y_val``) with the SMOTE-balanced rest
+    (``X_fit`` / ``y_fit``). Splits and SMOTE are seeded exactly as in the
+    notebook, so ``X_train`` / ``y_train`` are the notebook's sets.
+
+    With ``config['joint']`` there is also a ``'joint'`` entry: one split
+    stratified on the (jam, peak) pair, ``y_*`` holding joint codes (see
+    joint.py) and SMOTE balancing the pairs.
+    """
+    import numpy as np
+    from imblearn.over_sampling import SMOTE
+    from sklearn.model_selection import train_test_split
+
+    from .joint import joint_codes
+
+    seed = config['random_state']
+    preprocessor = build_preprocessor()
+    X_processed = preprocessor.fit_transform(feature_frame(df))
+    prepared = {'preprocessor': preprocessor, 'X_processed': X_processed, 'targets': {}}
+    targets = {name: df[column].to_numpy() for name, column in config['targets'].items()}
+    if config.get('joint'):
+        classes = [np.unique(targets[name]) for name in ('jam', 'peak')]
+        targets['joint'] = joint_codes(targets['jam'], targets['peak'], *classes)
+        prepared['joint_classes'] = classes
+    for name, y in targets.items():
+        X_train, X_test, y_train, y_test = train_test_split(
+            X_processed, y, test_size=config['test_size'], random_state=seed, stratify=y)
+        X_fit, X_val, y_fit, y_val = train_test_split(
+            X_train, y_train, test_size=config['validation_size'], random_state=seed, stratify=y_train)
+        X_train, y_train = SMOTE(random_state=seed).fit_resample(X_train, y_train)
+        X_fit, y_fit = SMOTE(random_state=seed).fit_resample(X_fit, y_fit)
+        prepared['targets'][name] = {
+            'X_train': X_train, 'y_train': y_train, 'X_test': X_test, 'y_test': y_test,
+            'X_fit': X_fit, 'y_fit': y_fit, 'X_val': X_val, 'y_val': y_val,
+        }
+    return prepared
+
+
+def load_or_prepare(source_path=SOURCE_CSV, cache_dir=DEFAULT_CACHE_DIR, config=PREPARE_CONFIG):
+    """Path of the cached prep for ``source_path`` and ``config``, building it on a miss.
+
+    Returns (path, cache hit). The file is an uncompressed joblib dump, so
+    it can be opened with ``mmap_mode='r'`` and its arrays shared by the
+    search workers.
+    """
+    import joblib
+
+    path = os.path.join(cache_dir, f"prepared-{cache_key(source_path, config)}.joblib")
+    if os.path.exists(path):
+        return path, True
+    os.makedirs(cache_dir, exist_ok=True)
+    prepared = prepare(load_training_frame(source_path), config)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    joblib.dump(prepared, tmp_path)
+    os.replace(tmp_path, path)
+    return path, False
+
+
+def param_candidates(grid=PARAM_GRID):
+    """Every combination of ``grid`` as a list of parameter dicts."""
+    names = sorted(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+
+
+def _init_worker(prepared_path):
+    global _prepared
+    import joblib
+
+    _prepared = joblib.load(prepared_path, mmap_mode='r')
+
+
+def evaluate_candidate(target, params, random_state=PREPARE_CONFIG['random_state']):
+    """Fit one candidate on the search split and score it on the validation slice (runs in a worker)."""
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.metrics import accuracy_score, f1_score
+
+    sets = _prepared['targets'][target]
+    start = time.perf_counter()
+    model = RandomForestClassifier(random_state=random_state, n_jobs=1, **params)
+    model.fit(sets['X_fit'], sets['y_fit'])
+    fit_seconds = time.perf_counter() - start
+    predicted = model.predict(sets['X_val'])
+    return {
+        'target': target,
+        'params': params,
+        'f1_macro': float(f1_score(sets['y_val'], predicted, average='macro')),
+        'accuracy': float(accuracy_score(sets['y_val'], predicted)),
+        'fit_seconds': round(fit_seconds, 3),
+    }
+
+
+def search(prepared_path, candidates, workers=None, targets=tuple(TARGETS)):
+    """Evaluate every (target, candidate) pair; returns the results, best first per target.
+
+    ``workers=0`` runs in this process. Larger forests are submitted
+    first so the slowest fits do not end up alone at the tail.
+    """
+    workers = os.cpu_count() if workers is None else workers
+    tasks = sorted(itertools.product(targets, candidates), key=lambda task: -task[1]['n_estimators'])
+    if workers == 0:
+        _init_worker(prepared_path)
+        results = [evaluate_candidate(target, params) for target, params in tasks]
+    else:
+        with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(prepared_path,)) as pool:
+            futures = [pool.submit(evaluate_candidate, target, params) for target, params in tasks]
+            results = [future.result() for future in as_completed(futures)]
+    return sorted(results, key=lambda result: (result['target'], -result['f1_macro'], result['fit_seconds']))
+
+
+def fit_final(prepared, target, params, random_state=PREPARE_CONFIG['random_state']):
+    """Fit ``params`` on the full SMOTE training split and score it on the test split."""
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.metrics import accuracy_score, classification_report, f1_score
+
+    sets = prepared['targets'][target]
+    model = RandomForestClassifier(random_state=random_state, n_jobs=-1, **params)
+    model.fit(sets['X_train'], sets['y_train'])
+    predicted = model.predict(sets['X_test'])
+    return model, {
+        'params': params,
+        'test_accuracy': float(accuracy_score(sets['y_test'], predicted)),
+        'test_f1_macro': float(f1_score(sets['y_test'], predicted, average='macro')),
+        'classification_report': classification_report(sets['y_test'], predicted, output_dict=True),
+    }
+
+
+def fit_joint(prepared, params=NOTEBOOK_PARAMS, random_state=PREPARE_CONFIG['random_state']):
+    """Fit the joint jam + peak forest on its SMOTE training split and score both labels on its test split."""
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.metrics import accuracy_score, f1_score
+
+    from .joint import JointModel
+
+    sets = prepared['targets']['joint']
+    jam_classes, peak_classes = prepared['joint_classes']
+    model = RandomForestClassifier(random_state=random_state, n_jobs=-1, **params)
+    model.fit(sets['X_train'], sets['y_train'])
+    joint = JointModel(model, jam_classes, peak_classes)
+    # The true label of each target, decoded from the joint codes
+    truths = {'jam': jam_classes.take(sets['y_test'] // len(peak_classes)),
+              'peak': peak_classes.take(sets['y_test'] % len(peak_classes))}
+    metrics = {'params': params}
+    for name, view in [('jam', joint.jam), ('peak', joint.peak)]:
+        truth, predicted = truths[name], view.predict(sets['X_test'])
+        metrics[f'{name}_test_accuracy'] = float(accuracy_score(truth, predicted))
+        metrics[f'{name}_test_f1_macro'] = float(f1_score(truth, predicted, average='macro'))
+    return joint, metrics
+
+
+def train(source_path=SOURCE_CSV, out_dir='.', cache_dir=DEFAULT_CACHE_DIR, workers=None,
+          grid=PARAM_GRID, run_search=True, joint=False):
+    """Prepare (or reuse) the data, search, fit and write the artifacts; returns the metrics report.
+
+    ``joint=True`` also writes the joint jam + peak model (notebook
+    parameters) next to the two single-target models.
+    """
+    import joblib
+
+    timings = {}
+    start = time.perf_counter()
+    prepared_path, cache_hit = load_or_prepare(source_path, cache_dir)
+    prepared = joblib.load(prepared_path)
+    timings['prepare'] = time.perf_counter() - start
+
+    report = {
+        'source': source_path,
+        'cache_key': os.path.basename(prepared_path),
+        'cache_hit': cache_hit,
+        'workers': os.cpu_count() if workers is None else workers,
+        'targets': {},
+    }
+    best = {target: NOTEBOOK_PARAMS for target in TARGETS}
+    if run_search:
+        step = time.perf_counter()
+        results = search(prepared_path, param_candidates(grid), workers)
+        timings['search'] = time.perf_counter() - step
+        for target in TARGETS:
+            ranked = [result for result in results if result['target'] == target]
+            best[target] = ranked[0]['params']
+            report['targets'][target] = {'search': ranked}
+
+    step = time.perf_counter()
+    os.makedirs(out_dir, exist_ok=True)
+    models = {}
+    for target, params in best.items():
+        models[target], metrics = fit_final(prepared, target, params)
+        report['targets'].setdefault(target, {}).update(metrics)
+        joblib.dump(models[target], os.path.join(out_dir, MODEL_FILES[target]))
+    joblib.dump(prepared['preprocessor'], os.path.join(out_dir, PREPROCESSOR_FILE))
+    report['calibration'] = write_calibration(models, prepared, out_dir)
+    if joint:
+        model, report['joint'] = fit_joint(prepared)
+        joblib.dump(model, os.path.join(out_dir, MODEL_JOINT_FILE))
+    timings['fit'] = time.perf_counter() - step
+
+    timings['total'] = time.perf_counter() - start
+    report['seconds'] = {name: round(seconds, 2) for name, seconds in timings.items()}
+    with open(os.path.join(out_dir, METRICS_FILE), 'w') as f:
+        json.dump(report, f, indent=2, default=str)
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train the jam and peak models and write the .joblib artifacts")
+    parser.add_argument('--source', default=SOURCE_CSV)
+    parser.add_argument('--out-dir', default='.')
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR)
+    parser.add_argument('--workers', type=int, default=None, help="search processes (default: CPU count; 0 = in-process)")
+    parser.add_argument('--no-search', action='store_true', help="train the notebook's parameters only")
+    parser.add_argument('--joint', action='store_true', help="also train the single jam + peak model")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    report = train(args.source, args.out_dir, args.cache_dir, args.workers, run_search=not args.no_search,
+                   joint=args.joint)
+    for target, metrics in report['targets'].items():
+        logger.info("%s: test accuracy %.4f, macro F1 %.4f with %s", target, metrics['test_accuracy'],
+                    metrics['test_f1_macro'], metrics['params'])
+    if 'joint' in report:
+        logger.info("joint: jam accuracy %.4f, peak accuracy %.4f", report['joint']['jam_test_accuracy'],
+                    report['joint']['peak_test_accuracy'])
+    logger.info("Cache %s; %s seconds -> %s", 'hit' if report['cache_hit'] else 'miss', report['seconds'],
+                os.path.join(args.out_dir, METRICS_FILE))
@@ -0,0 +1,110 @@
+# ==============================================================================
+# weather.py - Pooled, timeout-bounded Open-Meteo forecast client
+# ==============================================================================
+# pandas and requests are imported on first use, so importing this module
+# (and everything that depends on it) stays cheap.
+from datetime import date
+
+OPEN_METEO_URL = "https://api.open-meteo.com/v1/forecast"
+HOURLY_VARIABLES = "temperature_2m,relative_humidity_2m,weather_code,wind_speed_10m"
+FORECAST_TIMEZONE = "Asia/Singapore"
+FORECAST_HORIZON_DAYS = 16  # Open-Meteo serves at most 16 days of forecast
+
+
+class WeatherClient:
+    """Open-Meteo client with a keep-alive connection pool, timeouts and bounded retries.
+
+    One client should be shared per process so consecutive requests reuse
+    the same TLS connection. Failed connects, read errors and 429/5xx
+    responses are retried up to ``retries`` times with exponential backoff
+    (``backoff_factor * 2**n`` seconds, honouring Retry-After).
+    """
+
+    def __init__(self, base_url=OPEN_METEO_URL, connect_timeout=3.05, read_timeout=10.0,
+                 retries=2, backoff_factor=0.3, pool_maxsize=10):
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+
+        self.base_url = base_url
+        self.timeout = (connect_timeout, read_timeout)
+        retry = Retry(
+            total=retries,
+            connect=retries,
+            read=retries,
+            status=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset({"GET"}),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_maxsize, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def fetch_forecast_json(self, lat: float, lon: float, start_date: str, end_date: str):
+        """Fetch hourly weather for an inclusive date range in a single request.
+
+        Returns the decoded JSON response (see ``parse_hourly``). Raises
+        ``requests.exceptions.RequestException`` on failure.
+        """
+        return self._get_json(lat, lon, start_date, end_date)
+
+    def fetch_forecast_json_many(self, locations, start_date: str, end_date: str):
+        """Fetch several (lat, lon) points in one request; returns one JSON block per point.
+
+        Open-Meteo accepts comma-separated coordinate lists and answers with
+        a list in the same order as the coordinates.
+        """
+        latitudes = ",".join(str(lat) for lat, _ in locations)
+        longitudes = ",".join(str(lon) for _, lon in locations)
+        data = self._get_json(latitudes, longitudes, start_date, end_date)
+        if isinstance(data, dict):
+            data = [data]
+        if len(data) != len(locations):
+            import requests
+            raise requests.exceptions.InvalidJSONError(
+                f"Expected {len(locations)} locations in the response, got {len(data)}"
+            )
+        return data
+
+    def _get_json(self, latitude, longitude, start_date, end_date):
+        params = {
+            "latitude": latitude,
+            "longitude": longitude,
+            "hourly": HOURLY_VARIABLES,
+            "start_date": start_date,
+            "end_date": end_date,
+            "timezone": FORECAST_TIMEZONE,
+        }
+        response = self.session.get(self.base_url, params=params, timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()
+
+    def close(self):
+        self.session.close()
+
+
+def parse_hourly(data):
+    """Turn the ``hourly`` block of an Open-Meteo response into a DataFrame.
+
+    Columns get the names the models were trained on (``weathercode``,
+    ``windspeed_10m``) plus a parsed ``datetime``.
+    """
+    import pandas as pd
+
+    forecast_df = pd.DataFrame(data['hourly'])
+    forecast_df['datetime'] = pd.to_datetime(forecast_df['time'])
+    return forecast_df.rename(columns={
+        'weather_code': 'weathercode',
+        'wind_speed_10m': 'windspeed_10m'
+    })
+
+
+def slice_date(forecast_df, target_date: date):
+    """Rows of a multi-day forecast frame that fall on ``target_date``."""
+    import pandas as pd
+
+    day_rows = forecast_df[forecast_df['datetime'].dt.normalize() == pd.Timestamp(target_date)]
+    return day_rows.reset_index(drop=True)
@@ -0,0 +1,77 @@
+# ==============================================================================
+# test_featurizer.py - Featurizer against the fitted ColumnTransformer
+# ==============================================================================
+import numpy as np
+import pandas as pd
+import pytest
+
+from melakago.features import MONTH_MAP, Featurizer
+from melakago.train import build_preprocessor, feature_frame
+
+DAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+
+def make_rows(n_rows, seed=0, days=DAYS, weathercodes=(0, 1, 3, 51, 61, 63)):
+    rng = np.random.default_rng(seed)
+    day_of_week = rng.choice(days, n_rows)
+    return pd.DataFrame({
+        'temperature_2m': rng.normal(28, 2, n_rows),
+        'relative_humidity_2m': rng.uniform(50, 100, n_rows),
+        'weathercode': rng.choice(weathercodes, n_rows),
+        'windspeed_10m': rng.uniform(0, 20, n_rows),
+        'is_weekend': np.isin(day_of_week, ['Saturday', 'Sunday']),
+        'hour': rng.integers(0, 24, n_rows),
+        'is_holiday_mlk': rng.random(n_rows) < 0.1,
+        'day_of_week': day_of_week,
+        'month': rng.choice(list(MONTH_MAP), n_rows),
+    })
+
+
+def featurize(featurizer, rows, **kwargs):
+    return featurizer.transform(
+        hour=rows['hour'].to_numpy(),
+        day_of_week=rows['day_of_week'].to_numpy(),
+        month=rows['month'].map(MONTH_MAP).to_numpy(),
+        is_weekend=rows['is_weekend'].to_numpy(),
+        is_holiday_mlk=rows['is_holiday_mlk'].to_numpy(),
+        temperature_2m=rows['temperature_2m'].to_numpy(),
+        relative_humidity_2m=rows['relative_humidity_2m'].to_numpy(),
+        weathercode=rows['weathercode'].to_numpy(),
+        windspeed_10m=rows['windspeed_10m'].to_numpy(),
+        **kwargs,
+    )
+
+
+@pytest.fixture(scope='module')
+def preprocessor():
+    return build_preprocessor().fit(feature_frame(make_rows(200)))
+
+
+def test_matches_preprocessor(preprocessor):
+    rows = make_rows(100, seed=1)
+    expected = np.asarray(preprocessor.transform(feature_frame(rows)), dtype=np.float32)
+    actual = featurize(Featurizer(preprocessor), rows)
+    assert actual.dtype == np.float32
+    assert np.array_equal(actual, expected)
+
+
+def test_unknown_categories_are_ignored(preprocessor):
+    # handle_unknown='ignore': an unseen weather code gets no one-hot column
+    rows = make_rows(20, seed=2, weathercodes=(2, 95))
+    expected = np.asarray(preprocessor.transform(feature_frame(rows)), dtype=np.float32)
+    assert np.array_equal(featurize(Featurizer(preprocessor), rows), expected)
+
+
+def test_scalars_broadcast_and_out_buffer(preprocessor):
+    featurizer = Featurizer(preprocessor)
+    rows = make_rows(24, seed=3).assign(hour=np.arange(24), day_of_week='Tuesday', month='March',
+                                        is_weekend=False, is_holiday_mlk=False, weathercode=3)
+    expected = np.asarray(preprocessor.transform(feature_frame(rows)), dtype=np.float32)
+
+    out = np.full((30, featurizer.n_features_out_), 7.0, dtype=np.float32)  # stale values must be cleared
+    actual = featurizer.transform(hour=np.arange(24), day_of_week='Tuesday', month=3, is_weekend=False,
+                                  is_holiday_mlk=False, temperature_2m=rows['temperature_2m'].to_numpy(),
+                                  relative_humidity_2m=rows['relative_humidity_2m'].to_numpy(), weathercode=3,
+                                  windspeed_10m=rows['windspeed_10m'].to_numpy(), out=out)
+    assert np.array_equal(actual, expected)
+    assert np.shares_memory(actual, out)
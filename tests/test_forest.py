@@ -0,0 +1,145 @@
+# ==============================================================================
+# test_forest.py - CompiledForest against sklearn's RandomForestClassifier
+# ==============================================================================
+import os
+
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+
+from melakago.forest import CompiledForest
+
+
+def make_rows(n_rows=300, n_features=6, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.normal(size=(n_rows, n_features)), rng
+
+
+@pytest.mark.parametrize("labels", ["bool", "strings"])
+def test_matches_sklearn(labels):
+    X, rng = make_rows()
+    score = X[:, 0] + 0.5 * X[:, 1] - X[:, 2] * X[:, 3]
+    if labels == "bool":
+        y = score > 0
+    else:
+        y = np.where(score > 0.5, 'Peak', np.where(score < -0.5, 'Off-Peak', 'Shoulder'))
+    forest = RandomForestClassifier(n_estimators=15, max_depth=8, random_state=0).fit(X, y)
+    compiled = CompiledForest(forest)
+
+    X_new = rng.normal(size=(200, X.shape[1]))
+    assert np.array_equal(compiled.predict_proba(X_new), forest.predict_proba(X_new))
+    assert np.array_equal(compiled.predict(X_new), forest.predict(X_new))
+    assert np.array_equal(compiled.classes_, forest.classes_)
+
+
+def test_single_row_and_float32_rounding():
+    X, rng = make_rows()
+    y = X[:, 0] > 0
+    forest = RandomForestClassifier(n_estimators=10, random_state=0).fit(X, y)
+    compiled = CompiledForest(forest)
+
+    # Values right at a threshold: sklearn compares float32 features, so must we
+    threshold = forest.estimators_[0].tree_.threshold[0]
+    X_edge = np.tile(X[:1], (3, 1))
+    X_edge[:, forest.estimators_[0].tree_.feature[0]] = [threshold, np.nextafter(threshold, np.inf), threshold - 1e-9]
+    for rows in (X[:1], X_edge):
+        assert np.array_equal(compiled.predict_proba(rows), forest.predict_proba(rows))
+
+
+def test_nan_routing_learned_from_training():
+    X, rng = make_rows()
+    y = X[:, 0] + X[:, 1] > 0
+    X_train = X.copy()
+    X_train[rng.random(X.shape) < 0.1] = np.nan  # trees learn a side for missing values
+    forest = RandomForestClassifier(n_estimators=15, random_state=0).fit(X_train, y)
+    compiled = CompiledForest(forest)
+
+    X_new = rng.normal(size=(200, X.shape[1]))
+    X_new[rng.random(X_new.shape) < 0.2] = np.nan
+    assert np.array_equal(compiled.predict_proba(X_new), forest.predict_proba(X_new))
+
+
+def test_nan_at_predict_time_only():
+    X, rng = make_rows()
+    y = X[:, 0] > 0
+    forest = RandomForestClassifier(n_estimators=15, random_state=0).fit(X, y)
+    compiled = CompiledForest(forest)
+
+    X_new = rng.normal(size=(200, X.shape[1]))
+    X_new[rng.random(X_new.shape) < 0.2] = np.nan
+    assert np.array_equal(compiled.predict_proba(X_new), forest.predict_proba(X_new))
+
+
+def test_rejects_wrong_feature_count():
+    X, _ = make_rows()
+    compiled = CompiledForest(RandomForestClassifier(n_estimators=3, random_state=0).fit(X, X[:, 0] > 0))
+    with pytest.raises(ValueError, match="features"):
+        compiled.predict_proba(X[:, :-1])
+
+
+def test_load_compiled_memory_maps_forests_and_joint_models(tmp_path):
+    import joblib
+
+    from melakago.forest import compiled_path_for, load_compiled
+    from melakago.joint import JointModel
+
+    X, rng = make_rows()
+    is_jam = X[:, 0] > 0
+    peak = np.where(X[:, 1] > 0.5, 'Peak', np.where(X[:, 1] < -0.5, 'Off-Peak', 'Shoulder'))
+    forest = RandomForestClassifier(n_estimators=5, random_state=0).fit(X, is_jam)
+    joint = JointModel.fit(RandomForestClassifier(n_estimators=5, random_state=0), X, is_jam, peak)
+    X_new = rng.normal(size=(50, X.shape[1]))
+
+    for name, model in (('forest', forest), ('joint', joint)):
+        path = str(tmp_path / f'{name}.joblib')
+        joblib.dump(model, path)
+        loaded = load_compiled(path)
+        assert os.path.exists(compiled_path_for(path))
+        again = load_compiled(path)  # served from the dump
+        compiled = again.model if name == 'joint' else again
+        assert isinstance(compiled, CompiledForest)
+        assert isinstance(compiled.value, np.ndarray) and not compiled.value.flags.writeable  # read-only mapping
+        for result in (loaded, again):
+            # A JointModel returns (jam proba, peak proba)
+            assert np.array_equal(np.hstack(result.predict_proba(X_new)), np.hstack(model.predict_proba(X_new)))
+
+
+def test_stale_dump_is_rebuilt_once_by_concurrent_loaders(tmp_path, monkeypatch):
+    import multiprocessing
+    import time
+
+    import joblib
+
+    from melakago import forest as forest_module
+
+    X, rng = make_rows()
+    forest = RandomForestClassifier(n_estimators=5, random_state=0).fit(X, X[:, 0] > 0)
+    path = str(tmp_path / 'forest.joblib')
+    joblib.dump(forest, path)
+    forest_module.build_compiled(path)
+    os.utime(path, ns=(0, 0))  # the model looks replaced, so the dump is stale
+
+    builds = tmp_path / 'builds.log'
+    build_compiled = forest_module.build_compiled
+
+    def counting_build(*args, **kwargs):
+        with open(builds, 'a') as log:
+            log.write('build\n')
+        time.sleep(0.5)  # a slow rebuild, so every loader finds the dump stale while it runs
+        return build_compiled(*args, **kwargs)
+
+    monkeypatch.setattr(forest_module, 'build_compiled', counting_build)
+    X_new = rng.normal(size=(20, X.shape[1]))
+    expected = forest.predict_proba(X_new)
+
+    def load_and_check():
+        assert np.array_equal(forest_module.load_compiled(path).predict_proba(X_new), expected)
+
+    workers = [multiprocessing.get_context('fork').Process(target=load_and_check) for _ in range(6)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    assert [worker.exitcode for worker in workers] == [0] * len(workers)
+    assert builds.read_text().count('build') == 1
+    assert not list(tmp_path.glob('*.tmp'))
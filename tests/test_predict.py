@@ -0,0 +1,34 @@
+# ==============================================================================
+# test_predict.py - Labels and confidences of Predictor.predict
+# ==============================================================================
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+
+from melakago.calibration import Calibrator
+from melakago.forest import CompiledForest
+from melakago.predict import Predictor
+
+
+def test_calibration_keeps_the_forests_labels():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(400, 5))
+    score = X[:, 0] + X[:, 1]
+    is_jam = score > 0
+    peak = np.where(score > 0.7, 'Peak', np.where(score < -0.7, 'Off-Peak', 'Shoulder'))
+    model_jam = CompiledForest(RandomForestClassifier(n_estimators=10, random_state=0).fit(X, is_jam))
+    model_peak = CompiledForest(RandomForestClassifier(n_estimators=10, random_state=0).fit(X, peak))
+    # Calibrated on deliberately shuffled labels, so the calibrated argmax often disagrees with the votes
+    calibration = {'jam': Calibrator.fit(model_jam.predict_proba(X), rng.permutation(is_jam), model_jam.classes_),
+                   'peak': Calibrator.fit(model_peak.predict_proba(X), rng.permutation(peak), model_peak.classes_)}
+    predictor = Predictor(model_jam, model_peak, None, None, None, calibration=calibration)
+
+    X_new = rng.normal(size=(200, 5))
+    result = predictor.predict(X_new)
+    assert np.array_equal(result['is_jam'], model_jam.predict(X_new))
+    assert np.array_equal(result['peak_category'], model_peak.predict(X_new))
+
+    peak_proba = calibration['peak'].transform(model_peak.predict_proba(X_new))
+    assert not np.array_equal(model_peak.classes_.take(peak_proba.argmax(axis=1)), result['peak_category'])
+    voted = np.searchsorted(model_peak.classes_, result['peak_category'])
+    assert np.array_equal(result['peak_confidence'], peak_proba[np.arange(len(X_new)), voted])
+    assert np.array_equal(result['peak_proba'], peak_proba)